@@ -0,0 +1,198 @@
+# drf_api/middleware.py
+"""
+Per-request profiling.
+
+``RequestProfilingMiddleware`` measures every request: wall time, the
+number and duration of database queries, time spent producing
+``serializer.data`` and cache hits/misses. The figures are sent back in
+a ``Server-Timing`` header (visible in the browser's network panel) and
+logged as one JSON line on the ``drf_api.requests`` logger, at WARNING
+level for requests slower than REQUEST_PROFILE_SLOW_MS.
+
+A REQUEST_PROFILE_SAMPLE_RATE fraction of requests also runs under
+cProfile; the stats of the sampled requests that turn out slow are
+dumped to REQUEST_PROFILE_DIR for ``python -m pstats`` or snakeviz.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger('drf_api.requests')
+
+_current = ContextVar('request_profile', default=None)
+_MISSING = object()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._serializing = False
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+
+def _timed_data(data):
+    """Wrap a serializer's ``data`` property to time it."""
+
+    def timed(self):
+        profile = _current.get()
+        # Only the outermost serializer counts; nested ones are within it.
+        if profile is None or profile._serializing:
+            return data.fget(self)
+        profile._serializing = True
+        start = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            profile.serializer_time += time.perf_counter() - start
+            profile._serializing = False
+
+    timed._profiled = True
+    return property(timed)
+
+
+def _install_serializer_timing():
+    for cls in (serializers.BaseSerializer, serializers.Serializer,
+                serializers.ListSerializer):
+        if not getattr(cls.data.fget, '_profiled', False):
+            cls.data = _timed_data(cls.data)
+
+
+@contextmanager
+def _counting_cache_hits(profile):
+    """Count hits and misses of get()/get_many() on every cache."""
+    patched = []
+    for cache in caches.all():
+        get, get_many = cache.get, cache.get_many
+
+        def counted_get(key, default=None, version=None, _get=get):
+            value = _get(key, _MISSING, version=version)
+            if value is _MISSING:
+                profile.cache_misses += 1
+                return default
+            profile.cache_hits += 1
+            return value
+
+        def counted_get_many(keys, version=None, _get_many=get_many):
+            keys = list(keys)
+            found = _get_many(keys, version=version)
+            profile.cache_hits += len(found)
+            profile.cache_misses += len(keys) - len(found)
+            return found
+
+        cache.get, cache.get_many = counted_get, counted_get_many
+        patched.append(cache)
+    try:
+        yield
+    finally:
+        for cache in patched:
+            del cache.get, cache.get_many
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _install_serializer_timing()
+
+    def __call__(self, request):
+        if not settings.REQUEST_PROFILING:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        profiler = None
+        if random.random() < settings.REQUEST_PROFILE_SAMPLE_RATE:
+            profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(profile.record_query))
+                stack.enter_context(_counting_cache_hits(profile))
+                if profiler is not None:
+                    try:
+                        profiler.enable()
+                    except ValueError:
+                        # Another profiler is already active.
+                        profiler = None
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = self.server_timing(profile, total)
+        slow = total * 1000 >= settings.REQUEST_PROFILE_SLOW_MS
+        dump = None
+        if profiler is not None and slow:
+            dump = self.dump_stats(profiler, request, total)
+        self.log(request, response, profile, total, slow, dump)
+        return response
+
+    @staticmethod
+    def server_timing(profile, total):
+        return ', '.join([
+            f'total;dur={total * 1000:.2f}',
+            f'db;dur={profile.query_time * 1000:.2f};'
+            f'desc="{profile.queries} queries"',
+            f'serialize;dur={profile.serializer_time * 1000:.2f}',
+            f'cache;desc="{profile.cache_hits} hits / '
+            f'{profile.cache_misses} misses"',
+        ])
+
+    @staticmethod
+    def dump_stats(profiler, request, total):
+        directory = settings.REQUEST_PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'[^\w-]+', '_', request.path).strip('_') or 'root'
+        path = os.path.join(directory, '%s-%s-%s-%dms.prof' % (
+            time.strftime('%Y%m%dT%H%M%S'), request.method, slug[:80],
+            total * 1000))
+        profiler.dump_stats(path)
+        return path
+
+    @staticmethod
+    def log(request, response, profile, total, slow, dump):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 2),
+            'db_queries': profile.queries,
+            'db_ms': round(profile.query_time * 1000, 2),
+            'serializer_ms': round(profile.serializer_time * 1000, 2),
+            'cache_hits': profile.cache_hits,
+            'cache_misses': profile.cache_misses,
+        }
+        if dump:
+            record['profile'] = dump
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps(record), extra={'request_profile': record})
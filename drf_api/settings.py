@@ -12,8 +12,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from corsheaders.defaults import default_headers
 load_dotenv()
@@ -29,9 +31,19 @@ CLOUDINARY_STORAGE = {
 }
 
 MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
+# Task attachments are uploaded by a background thread pool
+# (productivity_app/uploads.py). Point FILE_UPLOAD_BACKEND at
+# 'productivity_app.uploads.LocalUploadBackend' to keep files under
+# MEDIA_ROOT instead of Cloudinary.
+FILE_UPLOAD_BACKEND = os.environ.get(
+    'FILE_UPLOAD_BACKEND', 'productivity_app.uploads.CloudinaryUploadBackend')
+FILE_UPLOAD_ASYNC = os.environ.get('FILE_UPLOAD_ASYNC', '1') == '1'
+FILE_UPLOAD_WORKERS = int(os.environ.get('FILE_UPLOAD_WORKERS', 4))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
@@ -74,6 +86,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack.
+    'drf_api.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -96,7 +110,7 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
     'access-control-allow-credentials',
 ]
 
-CORS_EXPOSE_HEADERS = ["Content-Type", "X-CSRFToken"]
+CORS_EXPOSE_HEADERS = ["Content-Type", "X-CSRFToken", "Server-Timing"]
 
 
 CSRF_TRUSTED_ORIGINS = [
@@ -130,17 +144,48 @@ TEMPLATES = [
 WSGI_APPLICATION = 'drf_api.wsgi.application'
 
 
+# Database connections persist for DB_CONN_MAX_AGE seconds (0 closes
+# them after every request) and are health-checked before reuse.
+# DB_POOL=1 uses Django's PostgreSQL connection pool instead, which also
+# suits the ASGI server; it requires psycopg 3 (`psycopg[pool]`, pinned in
+# requirements.txt) and ignores DB_CONN_MAX_AGE.
+# `manage.py benchmark_db_connections` compares the three modes.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1'
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+DB_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+    'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+}
+
 if 'DEV' in os.environ:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
 else:
     DATABASES = {
-        'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
+        'default': dj_database_url.parse(
+            os.environ.get("DATABASE_URL"),
+            # Pooled connections go back to the pool instead.
+            conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        )
     }
+    if DB_POOL:
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            raise ImproperlyConfigured(
+                "DB_POOL=1 requires psycopg 3 with its connection pool; "
+                "install 'psycopg[pool]' or unset DB_POOL.")
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = (
+            DB_POOL_OPTIONS)
     print("connected to database")
 
 
@@ -202,27 +247,171 @@ WHITENOISE_ROOT = BASE_DIR / 'staticfiles' / 'build'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Caching
+# Local memory by default (and in tests); set REDIS_URL to share the
+# cache between workers. Requires the `redis` package.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'productivity-app',
+        }
+    }
+
+# Whether every process serving requests sees the same cache: with
+# REDIS_URL, in development (one runserver process), or when
+# SHARED_CACHE=1 declares that a single process serves the site. The
+# local-memory cache of one worker never sees another worker's
+# invalidations, so without a shared cache the task list, stats and
+# profile directory caches are turned off.
+SHARED_CACHE = (
+    bool(REDIS_URL) or DEBUG or os.environ.get('SHARED_CACHE') == '1')
+
+# Seconds a user's cached /api/tasks/ response may be served. Entries
+# are also invalidated by task, file and assignment changes.
+TASK_LIST_CACHE_TIMEOUT = int(os.environ.get('TASK_LIST_CACHE_TIMEOUT', 60))
+
+# Seconds a page of the public /api/profiles/ directory may be served.
+# Invalidated when a profile, or a user's name or email, changes.
+PROFILE_LIST_CACHE_TIMEOUT = int(
+    os.environ.get('PROFILE_LIST_CACHE_TIMEOUT', 300))
+
+# Seconds a user's /api/tasks/stats/ response may be served; 0 disables
+# caching. Invalidated together with the task lists.
+TASK_STATS_CACHE_TIMEOUT = int(os.environ.get('TASK_STATS_CACHE_TIMEOUT', 30))
+
+
+# Request profiling (drf_api/middleware.py): Server-Timing headers and
+# one JSON log line per request on the `drf_api.requests` logger.
+# Requests slower than REQUEST_PROFILE_SLOW_MS are logged as warnings; a
+# REQUEST_PROFILE_SAMPLE_RATE fraction of requests runs under cProfile,
+# and the slow ones among them are dumped to REQUEST_PROFILE_DIR.
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', '1') == '1'
+REQUEST_PROFILE_SLOW_MS = int(os.environ.get('REQUEST_PROFILE_SLOW_MS', 500))
+REQUEST_PROFILE_SAMPLE_RATE = float(
+    os.environ.get('REQUEST_PROFILE_SAMPLE_RATE', 0))
+REQUEST_PROFILE_DIR = os.environ.get(
+    'REQUEST_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'profiles'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'drf_api.requests': {
+            'handlers': ['console'],
+            # Only slow requests in development and tests.
+            'level': os.environ.get(
+                'REQUEST_LOG_LEVEL',
+                'WARNING' if 'DEV' in os.environ else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+
 ASGI_APPLICATION = 'drf_api.asgi.application'
 
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+# Task events reach only the sockets of the same process with the
+# in-memory layer; with REDIS_URL they are shared between workers.
+# Requires the `channels_redis` package.
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
     }
-}
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'productivity_app.auth.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
-    ]
+    ],
+    'DEFAULT_PAGINATION_CLASS': (
+        'productivity_app.pagination.KeysetCursorPagination'
+    ),
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)),
 }
 
+# Upper bound for the ?page_size= query parameter.
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
+
+# Seconds a built category catalogue may live in the cache. It is also
+# invalidated whenever a Category changes, but without SHARED_CACHE only
+# in the worker that made the change, so the default is much shorter.
+CATEGORY_CACHE_TIMEOUT = int(os.environ.get(
+    'CATEGORY_CACHE_TIMEOUT', 86400 if SHARED_CACHE else 300))
+
+# Upper bound for operations in one POST /api/tasks/bulk/ request.
+TASK_BULK_MAX_ITEMS = int(os.environ.get('TASK_BULK_MAX_ITEMS', 50000))
+
+# Delta sync (GET /api/tasks/sync/). Each sync re-reads this many seconds
+# before the client's cursor, so rows committed just after a cursor was
+# issued are not missed. Clients whose cursor is older than the tombstone
+# retention get a full snapshot instead.
+TASK_SYNC_OVERLAP_SECONDS = int(
+    os.environ.get('TASK_SYNC_OVERLAP_SECONDS', 5))
+TASK_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get('TASK_TOMBSTONE_RETENTION_DAYS', 30))
+# Tasks per page of a sync's "changed" list; the rest follows the "next"
+# link. Bounds full snapshots for users with many tasks.
+TASK_SYNC_PAGE_SIZE = int(os.environ.get('TASK_SYNC_PAGE_SIZE', 500))
+
+# API requests are authenticated from the access token's claims alone.
+# With JWT_CHECK_USER_ACTIVE, the user's active status is also checked,
+# served from the cache for JWT_USER_ACTIVE_CACHE_TIMEOUT seconds (and
+# refreshed whenever the user is saved); without it, a deactivated user
+# keeps access until their token expires.
+JWT_CHECK_USER_ACTIVE = os.environ.get('JWT_CHECK_USER_ACTIVE', '1') == '1'
+JWT_USER_ACTIVE_CACHE_TIMEOUT = int(
+    os.environ.get('JWT_USER_ACTIVE_CACHE_TIMEOUT', 60))
+
 AUTHENTICATION_BACKENDS = [
     'productivity_app.auth.backends.CustomAuthBackend',
     'django.contrib.auth.backends.ModelBackend',  # fallback
 ]
+
+# Failed logins allowed per client IP and per email address within each
+# LOGIN_FAILURE_WINDOW seconds. Further attempts get a 429 before any
+# password is hashed; a successful login clears the email's count.
+# The counts live in the default cache, so they are per worker unless
+# SHARED_CACHE (`manage.py check` warns when it isn't).
+LOGIN_FAILURES_PER_IP = int(os.environ.get('LOGIN_FAILURES_PER_IP', 20))
+LOGIN_FAILURES_PER_EMAIL = int(
+    os.environ.get('LOGIN_FAILURES_PER_EMAIL', 5))
+LOGIN_FAILURE_WINDOW = int(os.environ.get('LOGIN_FAILURE_WINDOW', 300))
+
+# PBKDF2 work factor. Every login pays for it once, so size it against
+# the login latency target with `manage.py benchmark_password_hashing`.
+# Stored hashes are re-encoded with a new value on the next login.
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 1_000_000))
+
+PASSWORD_HASHERS = [
+    'productivity_app.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
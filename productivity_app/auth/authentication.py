@@ -0,0 +1,81 @@
+# productivity_app/auth/authentication.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Model
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+
+def user_active_cache_key(user_id):
+    return f'auth:user-active:{user_id}'
+
+
+def is_user_active(user_id):
+    """
+    Whether ``user_id`` exists and is active, cached for
+    JWT_USER_ACTIVE_CACHE_TIMEOUT seconds. Saving or deleting the user
+    drops the entry (see signals.py).
+    """
+    key = user_active_cache_key(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = User.objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, active, settings.JWT_USER_ACTIVE_CACHE_TIMEOUT)
+    return active
+
+
+class StatelessUser(TokenUser):
+    """
+    The user a validated access token names, built from its claims
+    without loading the User row.
+
+    It compares equal to the User instance with the same pk, so ownership
+    checks such as ``request.user == obj.user`` work unchanged. Foreign
+    keys and lookups take ``request.user.pk``; views that need the full
+    row (e.g. to update it) load it themselves.
+    """
+
+    @cached_property
+    def id(self):
+        # simplejwt stores the claim as a string.
+        return User._meta.pk.to_python(
+            self.token[api_settings.USER_ID_CLAIM])
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, Model)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = TokenUser.__hash__
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    simplejwt authentication without the per-request User query.
+
+    With JWT_CHECK_USER_ACTIVE, deactivated or deleted users are refused
+    using the cached ``is_user_active``; otherwise a token stays valid
+    until it expires, whatever happens to its user.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification")
+        if settings.JWT_CHECK_USER_ACTIVE and not is_user_active(user_id):
+            raise AuthenticationFailed(
+                "User is inactive", code="user_inactive")
+        return StatelessUser(validated_token)
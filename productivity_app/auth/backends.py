@@ -2,21 +2,71 @@
 
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db.models import Value
+from django.db.models.functions import Lower
+
+from .throttling import LoginRateLimiter
 
 User = get_user_model()
 
 
+class LoginRateLimited(Exception):
+    def __init__(self, wait):
+        super().__init__(wait)
+        self.wait = wait
+
+
+def users_by_email(email):
+    """
+    Users whose email matches ``email`` case-insensitively. Filtering on
+    LOWER(email) lets the database use auth_user_email_lower_idx.
+    """
+    return User.objects.alias(email_lower=Lower('email')).filter(
+        email_lower=Lower(Value(email)))
+
+
+def authenticate_email(request, email, password):
+    """
+    The user with ``email`` and ``password``, or None.
+
+    Raises LoginRateLimited, without looking the user up or hashing the
+    password, once the client IP or the email has too many recent
+    failures. A failure is not recorded here: other backends may still
+    accept the credentials.
+    """
+    limiter = LoginRateLimiter(request, email)
+    wait = limiter.wait()
+    if wait is not None:
+        raise LoginRateLimited(wait)
+    user = users_by_email(email).order_by('id').first()
+    if user is None or not user.check_password(password):
+        return None
+    limiter.succeeded()
+    return user
+
+
+def check_credentials(request, email, password):
+    """authenticate_email(), recording a failure when it returns None."""
+    user = authenticate_email(request, email, password)
+    if user is None:
+        LoginRateLimiter(request, email).failed()
+    return user
+
+
 class CustomAuthBackend(ModelBackend):
     """
     A custom authentication backend that allows users to log in with email.
+
+    Failures are counted by the user_login_failed receiver in
+    signals.py, once every backend has refused the credentials.
     """
 
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
+        if username is None or password is None:
             return None
-
-        if user.check_password(password):
-            return user
-        return None
+        try:
+            return authenticate_email(request, username, password)
+        except LoginRateLimited:
+            # Stops authenticate() from trying the remaining backends.
+            raise PermissionDenied
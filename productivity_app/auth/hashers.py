@@ -0,0 +1,19 @@
+# productivity_app/auth/hashers.py
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2-SHA256 hasher with its work factor taken from
+    PASSWORD_PBKDF2_ITERATIONS.
+
+    The algorithm name is unchanged, so existing hashes keep verifying
+    and are re-encoded with the configured count on the user's next
+    successful login. ``manage.py benchmark_password_hashing`` shows the
+    latency of candidate counts.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
@@ -0,0 +1,47 @@
+# productivity_app/auth/throttling.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class LoginRateLimiter:
+    """
+    Counts failed logins per client IP and per email address in fixed
+    cache windows of LOGIN_FAILURE_WINDOW seconds, so that brute-force
+    attempts can be refused before any password is hashed.
+    """
+
+    def __init__(self, request, email):
+        self.window = settings.LOGIN_FAILURE_WINDOW
+        bucket = int(time.time() // self.window)
+        self.limits = {}
+        if request is not None:
+            ident = BaseThrottle().get_ident(request)
+            self.limits[f'login:fail:ip:{ident}:{bucket}'] = (
+                settings.LOGIN_FAILURES_PER_IP)
+        digest = hashlib.sha1(email.strip().lower().encode()).hexdigest()
+        self.email_key = f'login:fail:email:{digest}:{bucket}'
+        self.limits[self.email_key] = settings.LOGIN_FAILURES_PER_EMAIL
+
+    def wait(self):
+        """Seconds until the next attempt is allowed, or None."""
+        counts = cache.get_many(self.limits)
+        if any(counts.get(key, 0) >= limit
+               for key, limit in self.limits.items()):
+            return self.window - time.time() % self.window
+        return None
+
+    def failed(self):
+        for key in self.limits:
+            cache.add(key, 0, self.window)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr().
+                cache.set(key, 1, self.window)
+
+    def succeeded(self):
+        cache.delete(self.email_key)
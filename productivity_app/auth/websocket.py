@@ -0,0 +1,49 @@
+# productivity_app/auth/websocket.py
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Sets ``scope['user']`` from a simplejwt access token.
+
+    Browsers cannot set headers on a WebSocket handshake, so the token
+    is read from the ``?token=`` query parameter, falling back to an
+    ``Authorization: Bearer`` header for other clients.
+    """
+
+    async def __call__(self, scope, receive, send):
+        raw_token = self.get_raw_token(scope)
+        scope = dict(scope)
+        scope['user'] = (
+            await get_user_for_token(raw_token) if raw_token
+            else AnonymousUser()
+        )
+        return await super().__call__(scope, receive, send)
+
+    @staticmethod
+    def get_raw_token(scope):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        if query.get('token'):
+            return query['token'][0]
+        headers = dict(scope.get('headers', []))
+        scheme, _, token = headers.get(
+            b'authorization', b'').decode().partition(' ')
+        if scheme.lower() == 'bearer' and token:
+            return token
+        return None
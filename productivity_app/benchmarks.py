@@ -0,0 +1,222 @@
+# productivity_app/benchmarks.py
+"""
+Helpers shared by the ``benchmark_*`` management commands: timing
+loops, latency summaries and result output.
+"""
+import json
+import math
+import platform
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.utils import timezone
+
+from productivity_app.models import (
+    Category, File, Profile, Task, TaskAssignment
+)
+
+PASSWORD = 'benchmark-password'
+WORDS = (
+    'invoice report release review design deploy meeting budget client '
+    'backlog sprint migration research planning onboarding audit'
+).split()
+
+
+def measure(fn, iterations, warmup=0, setup=None):
+    """
+    Call ``fn`` ``warmup`` + ``iterations`` times; return the timings.
+    ``setup``, if given, runs untimed before every call.
+    """
+    samples = []
+    for i in range(warmup + iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        if i >= warmup:
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def summarize(samples):
+    """Latency statistics in milliseconds, plus throughput per second."""
+    total = sum(samples)
+    return {
+        'iterations': len(samples),
+        'mean_ms': round(total / len(samples) * 1000, 3) if samples else 0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples, default=0) * 1000, 3),
+        'throughput_per_s': round(len(samples) / total, 1) if total else 0,
+    }
+
+
+def format_table(rows, columns):
+    """Render ``rows`` (dicts) as a fixed-width text table."""
+    widths = {
+        column: max([len(column)] + [len(str(row.get(column, '')))
+                                     for row in rows])
+        for column in columns
+    }
+    header = {column: column for column in columns}
+    rule = {column: '-' * widths[column] for column in columns}
+    return '\n'.join(
+        '  '.join(
+            str(row.get(column, '')).ljust(widths[column])
+            for column in columns
+        ).rstrip()
+        for row in [header, rule, *rows]
+    )
+
+
+def environment():
+    """Where the numbers came from, stored alongside JSON results."""
+    connection = connections[DEFAULT_DB_ALIAS]
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'platform': platform.platform(),
+    }
+
+
+def write_json(path, name, results, config=None):
+    with open(path, 'w') as fh:
+        json.dump({
+            'benchmark': name,
+            'environment': environment(),
+            'config': config or {},
+            'results': results,
+        }, fh, indent=2, default=str)
+
+
+def read_json(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def regressions(baseline, results, key, tolerance):
+    """
+    Rows of ``results`` that got worse than the row of ``baseline`` with
+    the same ``key``: a p99 more than ``tolerance`` (a fraction) higher,
+    or more queries. Returns (row, baseline row, reasons) tuples.
+    """
+    before = {row[key]: row for row in baseline}
+    found = []
+    for row in results:
+        old = before.get(row[key])
+        if old is None:
+            continue
+        reasons = []
+        if row['p99_ms'] > old['p99_ms'] * (1 + tolerance):
+            reasons.append(f"p99 {old['p99_ms']} -> {row['p99_ms']} ms")
+        if row.get('queries', 0) > old.get('queries', 0):
+            reasons.append(
+                f"queries {old.get('queries', 0)} -> {row['queries']}")
+        if reasons:
+            found.append((row, old, reasons))
+    return found
+
+
+@contextmanager
+def temporary_connection(alias, **overrides):
+    """
+    A connection to the default database under ``alias`` with settings
+    ``overrides`` (e.g. CONN_MAX_AGE, OPTIONS), removed afterwards.
+    """
+    settings_dict = dict(connections.settings[DEFAULT_DB_ALIAS])
+    settings_dict.update(overrides)
+    connections.settings[alias] = settings_dict
+    try:
+        yield connections[alias]
+    finally:
+        connection = connections[alias]
+        connection.close()
+        if getattr(connection, 'pool', None) is not None:
+            connection.close_pool()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+@contextmanager
+def throwaway_database(enabled=True):
+    """
+    Run the block against a fresh test database, destroyed afterwards,
+    so seeded rows never reach the configured one. A no-op when not
+    ``enabled`` (the commands' --in-place).
+    """
+    if not enabled:
+        yield
+        return
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed_data(rng, users, categories, tasks, files_per_task):
+    """
+    Bulk-insert benchmark users (password PASSWORD), categories on top
+    of the existing ones, tasks assigned to 1-3 random users and
+    ``files_per_task`` files each. Returns the new users.
+    """
+    User = get_user_model()
+    today = timezone.now().date()
+    password = make_password(PASSWORD)
+    users = User.objects.bulk_create([
+        User(username=f'bench{i}', email=f'bench{i}@example.com',
+             password=password)
+        for i in range(users)
+    ])
+    Profile.objects.bulk_create([Profile(user=u) for u in users])
+    Category.objects.bulk_create([
+        Category(name=f'Benchmark {i}') for i in range(categories)
+    ], ignore_conflicts=True)
+    categories = list(Category.objects.all())
+
+    rows = []
+    for i in range(tasks):
+        priority = rng.choice(list(Task.PRIORITY_RANKS))
+        rows.append(Task(
+            title=' '.join(rng.sample(WORDS, 3)).capitalize(),
+            description=' '.join(rng.choices(WORDS, k=20)),
+            due_date=rng.choice([
+                None, today + timedelta(days=rng.randint(-30, 90))]),
+            priority=priority,
+            priority_rank=Task.PRIORITY_RANKS[priority],
+            category=rng.choice(categories),
+            status=rng.choice(Task.STATUS_CHOICES)[0],
+            created_by=rng.choice(users),
+        ))
+    rows = Task.objects.bulk_create(rows, batch_size=1000)
+    TaskAssignment.objects.bulk_create([
+        TaskAssignment(task=task, user=assignee)
+        for task in rows
+        for assignee in rng.sample(
+            users, min(len(users), rng.randint(1, 3)))
+    ], batch_size=1000)
+    File.objects.bulk_create([
+        File(task=task, url=f'https://example.com/{task.pk}/{n}.pdf')
+        for task in rows
+        for n in range(files_per_task)
+    ], batch_size=1000)
+    return users
@@ -0,0 +1,144 @@
+# productivity_app/cache.py
+"""
+Caching helpers for read-heavy endpoints.
+
+Cached values are tagged with a *version* that lives in the configured
+Django cache. Invalidation bumps the version instead of deleting keys,
+so every process (and every in-process LRU) notices the change on its
+next lookup without a database round trip.
+"""
+import hashlib
+import json
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, TaskAssignment
+
+CATEGORY_VERSION_KEY = 'categories:version'
+PROFILE_VERSION_KEY = 'profiles:version'
+
+CategoryCatalogue = namedtuple(
+    'CategoryCatalogue', ['data', 'etag', 'last_modified'])
+
+
+def get_version(key):
+    """Return the current version stored under ``key``, creating it."""
+    version = cache.get(key)
+    if version is None:
+        version = time.time()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(key):
+    cache.set(key, time.time(), None)
+
+
+def make_etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return '"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+# ──────────────────────────────
+#  Category catalogue
+# ──────────────────────────────
+def _build_category_catalogue(version):
+    key = f'categories:catalogue:{version}'
+    catalogue = cache.get(key)
+    if catalogue is None:
+        # Imported lazily; serializers.py imports this module.
+        from .serializers import CategorySerializer
+
+        data = CategorySerializer(
+            Category.objects.order_by('id'), many=True).data
+        catalogue = CategoryCatalogue(
+            data=[dict(item) for item in data],
+            etag=make_etag(data),
+            last_modified=int(version),
+        )
+        cache.set(key, catalogue, settings.CATEGORY_CACHE_TIMEOUT)
+    return catalogue
+
+
+# The in-process layer; used with a shared cache only.
+_load_category_catalogue = lru_cache(maxsize=8)(_build_category_catalogue)
+
+
+def get_category_catalogue():
+    """
+    The serialized category list. Served from the in-process LRU when the
+    shared version is unchanged, otherwise from the shared cache, and
+    only rebuilt from the database after an invalidation.
+
+    Without a shared cache, another worker's invalidation never reaches
+    this process and an LRU entry would never expire, so the LRU is
+    skipped and CATEGORY_CACHE_TIMEOUT bounds how stale the list gets.
+    """
+    version = get_version(CATEGORY_VERSION_KEY)
+    if settings.SHARED_CACHE:
+        return _load_category_catalogue(version)
+    return _build_category_catalogue(version)
+
+
+def invalidate_category_catalogue():
+    bump_version(CATEGORY_VERSION_KEY)
+    _load_category_catalogue.cache_clear()
+
+
+# ──────────────────────────────
+#  Public profile directory
+# ──────────────────────────────
+def profile_list_cache_key(request):
+    """Key for a cached /api/profiles/ page, shared by all users."""
+    version = get_version(PROFILE_VERSION_KEY)
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f'profiles:list:{version}:{url}'
+
+
+def invalidate_profile_lists():
+    bump_version(PROFILE_VERSION_KEY)
+
+
+# ──────────────────────────────
+#  Per-user task list responses
+# ──────────────────────────────
+def task_list_version_key(user_id):
+    return f'tasks:list:version:{user_id}'
+
+
+def task_list_cache_key(request):
+    """
+    Key for a cached response derived from the requesting user's tasks
+    (the list, stats), including the path and query string. It also
+    includes today's date, since which tasks are overdue changes at
+    midnight.
+    """
+    user_id = request.user.pk
+    version = get_version(task_list_version_key(user_id))
+    today = timezone.now().date().isoformat()
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f'tasks:list:{user_id}:{version}:{today}:{url}'
+
+
+def invalidate_task_lists(user_ids):
+    """Drop cached task lists of ``user_ids`` once the transaction commits."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    now = time.time()
+    transaction.on_commit(lambda: cache.set_many(
+        {task_list_version_key(pk): now for pk in user_ids}, None))
+
+
+def invalidate_task_lists_for(task_ids):
+    """Drop cached task lists of everyone assigned to ``task_ids``."""
+    invalidate_task_lists(TaskAssignment.objects.filter(
+        task_id__in=task_ids).values_list('user_id', flat=True))
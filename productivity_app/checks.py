@@ -0,0 +1,24 @@
+# productivity_app/checks.py
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Failed-login counters (auth/throttling.py) live in the default cache.
+    A per-process cache gives each worker its own counters, multiplying
+    the limits by the number of workers.
+    """
+    if settings.SHARED_CACHE:
+        return []
+    return [Warning(
+        "The default cache is not shared between processes, so each "
+        "worker counts failed logins on its own and "
+        "LOGIN_FAILURES_PER_IP / LOGIN_FAILURES_PER_EMAIL are multiplied "
+        "by the number of workers. Task list, stats and profile caching "
+        "are also off.",
+        hint="Set REDIS_URL, or SHARED_CACHE=1 if a single process "
+             "serves the site.",
+        id='productivity_app.W001',
+    )]
@@ -0,0 +1,33 @@
+# productivity_app/consumers.py
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .events import task_group_name
+
+
+class TaskConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes task events (see events.py) for the authenticated user.
+
+    Connect to ``/ws/tasks/?token=<access token>``. Anonymous connections
+    are rejected. The socket is receive-only; clients that reconnect
+    should call /api/tasks/sync/ to catch up on missed events.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+        self.group_name = task_group_name(user.pk)
+        await self.channel_layer.group_add(
+            self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(
+                self.group_name, self.channel_name)
+
+    async def task_events(self, event):
+        for payload in event['payloads']:
+            await self.send_json(payload)
@@ -0,0 +1,107 @@
+# productivity_app/events.py
+"""
+Real-time task events, pushed over the channel layer to TaskConsumer.
+
+Every user listens on their own group. Events are sent once the
+surrounding transaction commits and carry the task as serialized by the
+REST API, so clients can apply them without refetching:
+
+    {"event": "task.created", "task": {...}}
+    {"event": "task.updated", "task": {...}}
+    {"event": "task.deleted", "id": 42}
+
+``task.created`` goes to users the task was just assigned to,
+``task.deleted`` to users it was deleted or unassigned from.
+
+The events of one commit are batched per user: each group gets a single
+``task.events`` message carrying up to EVENT_BATCH_SIZE payloads, and all
+groups are sent from one trip into the event loop, so bulk writes do not
+pay for one channel-layer round trip per (task, user).
+"""
+import logging
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from .models import Task, TaskAssignment
+
+logger = logging.getLogger(__name__)
+
+EVENT_BATCH_SIZE = 100
+
+
+def task_group_name(user_id):
+    return f'tasks.user.{user_id}'
+
+
+async def _group_send_all(layer, batches):
+    for user_id, payloads in batches.items():
+        for start in range(0, len(payloads), EVENT_BATCH_SIZE):
+            try:
+                await layer.group_send(task_group_name(user_id), {
+                    'type': 'task.events',
+                    'payloads': payloads[start:start + EVENT_BATCH_SIZE],
+                })
+            except Exception:
+                # Losing a push must not fail the request; clients can
+                # catch up through /api/tasks/sync/.
+                logger.exception(
+                    "Could not publish task events to %s", user_id)
+
+
+def _send(batches):
+    """Send ``{user_id: [payload, ...]}`` to the users' groups."""
+    layer = get_channel_layer()
+    if layer is None or not batches:
+        return
+    async_to_sync(_group_send_all)(layer, batches)
+
+
+def _send_task_changes(task_ids, added):
+    # Imported lazily; serializers.py imports this module via signals.
+    from .serializers import TaskReadSerializer
+
+    tasks = Task.objects.filter(pk__in=task_ids).with_related()
+    assignees = {}
+    for task_id, user_id in TaskAssignment.objects.filter(
+            task_id__in=task_ids).values_list('task_id', 'user_id'):
+        assignees.setdefault(task_id, []).append(user_id)
+
+    batches = {}
+    for task in tasks.iterator(chunk_size=500):
+        data = TaskReadSerializer(task).data
+        for user_id in assignees.get(task.pk, ()):
+            event = ('task.created' if (task.pk, user_id) in added
+                     else 'task.updated')
+            batches.setdefault(user_id, []).append(
+                {'event': event, 'task': data})
+    _send(batches)
+
+
+def _send_task_removals(pairs):
+    batches = {}
+    for task_id, user_id in pairs:
+        batches.setdefault(user_id, []).append(
+            {'event': 'task.deleted', 'id': task_id})
+    _send(batches)
+
+
+def publish_task_changes(task_ids, added=()):
+    """
+    Send the current state of ``task_ids`` to their assignees after the
+    commit. ``added`` holds the ``(task_id, user_id)`` pairs that are new
+    assignments; those users get ``task.created``.
+    """
+    task_ids = set(task_ids)
+    if task_ids:
+        transaction.on_commit(
+            partial(_send_task_changes, task_ids, set(added)))
+
+
+def publish_task_removals(pairs):
+    """Tell each user in ``(task_id, user_id)`` pairs the task is gone."""
+    pairs = list(pairs)
+    if pairs:
+        transaction.on_commit(partial(_send_task_removals, pairs))
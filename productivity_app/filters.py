@@ -0,0 +1,95 @@
+# productivity_app/filters.py
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django_filters import rest_framework as django_filters
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from .models import Category, Task, TaskAssignment
+from .search import search_tasks
+
+User = get_user_model()
+
+
+class TaskFilterSet(django_filters.FilterSet):
+    """
+    Query parameters of /api/tasks/. Multi-value filters take repeated
+    parameters (``?status=pending&status=in_progress``); ranges take
+    ``_after`` / ``_before`` suffixes (``?due_date_after=2025-01-01``).
+
+    Each filter is backed by an index: the composite task indexes for
+    status, priority and category, TaskAssignment's (user, task) index
+    for assigned_user, and task_overdue_idx for overdue.
+    """
+    due_date = django_filters.DateFromToRangeFilter()
+    created_at = django_filters.IsoDateTimeFromToRangeFilter()
+    status = django_filters.MultipleChoiceFilter(
+        choices=Task.STATUS_CHOICES, distinct=False)
+    priority = django_filters.MultipleChoiceFilter(
+        choices=Task.PRIORITY_CHOICES, method='filter_priority',
+        distinct=False)
+    category = django_filters.ModelMultipleChoiceFilter(
+        queryset=Category.objects.all(), distinct=False)
+    assigned_user = django_filters.ModelMultipleChoiceFilter(
+        queryset=User.objects.all(), method='filter_assigned_user',
+        distinct=False)
+    overdue = django_filters.BooleanFilter(method='filter_overdue')
+
+    class Meta:
+        model = Task
+        fields = [
+            'due_date', 'created_at', 'status', 'priority', 'category',
+            'assigned_user', 'overdue',
+        ]
+
+    def filter_priority(self, queryset, name, value):
+        # Filter on the indexed rank rather than the label.
+        if not value:
+            return queryset
+        return queryset.filter(priority_rank__in=[
+            Task.PRIORITY_RANKS[priority] for priority in value])
+
+    def filter_assigned_user(self, queryset, name, value):
+        # A subquery rather than a join: no duplicate rows, no DISTINCT.
+        if not value:
+            return queryset
+        return queryset.filter(pk__in=TaskAssignment.objects.filter(
+            user__in=value).values('task_id'))
+
+    def filter_overdue(self, queryset, name, value):
+        if value is None:
+            return queryset
+        return queryset.overdue(value)
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    ``?ordering=priority`` sorts by ``priority_rank`` (low < medium <
+    high) instead of alphabetically by the stored label, and
+    ``?ordering=category`` by the ``category_id`` column, so cursors hold
+    the id rather than a Category.
+    """
+    aliases = {'priority': 'priority_rank', 'category': 'category_id'}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [self._resolve(field) for field in ordering]
+
+    def _resolve(self, field):
+        prefix = '-' if field.startswith('-') else ''
+        name = field.lstrip('-')
+        return prefix + self.aliases.get(name, name)
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    ``?search=`` runs a ranked full-text search over task titles and
+    descriptions (see search.py) instead of ``icontains`` scans.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search_tasks(queryset, text, connections[queryset.db])
@@ -0,0 +1,238 @@
+# productivity_app/management/commands/benchmark_api.py
+import random
+import statistics
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from productivity_app.benchmarks import (
+    PASSWORD,
+    WORDS,
+    format_table,
+    measure,
+    read_json,
+    regressions,
+    seed_data,
+    summarize,
+    throwaway_database,
+    write_json,
+)
+from productivity_app.models import Category, Task
+COLUMNS = ['endpoint', 'mean_ms', 'p50_ms', 'p99_ms', 'throughput_per_s',
+           'queries']
+
+# One benchmarked request. ``setup`` runs untimed before each call;
+# ``slow`` endpoints hash a password and use --auth-iterations.
+Endpoint = namedtuple(
+    'Endpoint', ['name', 'request', 'status', 'setup', 'slow'],
+    defaults=[None, False])
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users, categories, tasks and files, then measure latency, "
+        "throughput and queries per request for the API endpoints. Runs "
+        "in a throwaway test database unless --in-place is given. "
+        "Requests are sent one at a time through the full middleware "
+        "stack, so throughput is for a single client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5,
+                            help="Categories on top of the defaults.")
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--files-per-task', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument(
+            '--auth-iterations', type=int, default=10,
+            help="Iterations for login and register, which hash a "
+                 "password on every request.")
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            help="Only benchmark this endpoint (repeatable).")
+        parser.add_argument(
+            '--in-place', action='store_true',
+            help="Seed and benchmark the configured database instead of "
+                 "a throwaway test database. Seeded rows are kept.")
+        parser.add_argument('--json', metavar='PATH',
+                            help="Also write the results to PATH.")
+        parser.add_argument(
+            '--baseline', metavar='PATH',
+            help="Fail if an endpoint regressed against the results in "
+                 "PATH (a file written by --json).")
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help="Allowed p99 increase over the baseline, as a fraction.")
+
+    def handle(self, *args, **options):
+        with throwaway_database(not options['in_place']):
+            results = self.benchmark(options)
+
+        self.stdout.write(format_table(results, COLUMNS))
+        if options['json']:
+            config = {
+                name: options[name] for name in (
+                    'users', 'categories', 'tasks', 'files_per_task',
+                    'iterations', 'auth_iterations', 'warmup', 'seed')
+            }
+            write_json(options['json'], 'api', results, config)
+        if options['baseline']:
+            self.check_baseline(options, results)
+
+    def benchmark(self, options):
+        rng = random.Random(options['seed'])
+        user = self.seed(options, rng)
+        endpoints = self.endpoints(user, rng)
+        if options['endpoints']:
+            unknown = set(options['endpoints']) - {e.name for e in endpoints}
+            if unknown:
+                raise CommandError(
+                    "Unknown endpoint(s): " + ', '.join(sorted(unknown)))
+            endpoints = [
+                e for e in endpoints if e.name in options['endpoints']]
+
+        cache.clear()
+        results = []
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']):
+            for endpoint in endpoints:
+                iterations = options[
+                    'auth_iterations' if endpoint.slow else 'iterations']
+                results.append({
+                    'endpoint': endpoint.name,
+                    **self.run(endpoint, iterations, options['warmup']),
+                })
+        return results
+
+    def seed(self, options, rng):
+        """Seed the configured volumes; return the user measured."""
+        users = seed_data(
+            rng, options['users'], options['categories'], options['tasks'],
+            options['files_per_task'])
+        user = users[0]
+        self.stdout.write(
+            f"Seeded {len(users)} users, {Category.objects.count()} "
+            f"categories, {options['tasks']} tasks; {user.username} is "
+            f"assigned {user.task_assignments.count()}.")
+        return user
+
+    def endpoints(self, user, rng):
+        client = Client()
+        auth = {
+            'HTTP_AUTHORIZATION':
+                f'Bearer {RefreshToken.for_user(user).access_token}',
+        }
+        task = Task.objects.assigned_to(user).order_by('id').first()
+        if task is None:
+            raise CommandError("The benchmark user has no tasks; seed more.")
+        category = Category.objects.order_by('id').first()
+        registered = iter(range(10 ** 9))
+
+        def post(url, data, **extra):
+            return client.post(
+                url, data, content_type='application/json', **extra)
+
+        def register():
+            n = next(registered)
+            return post(reverse('productivity_app:register'), {
+                'username': f'registered{n}',
+                'email': f'registered{n}@example.com',
+                'password': PASSWORD,
+                'confirm_password': PASSWORD,
+            })
+
+        def update_task():
+            return client.patch(
+                reverse('productivity_app:task-detail', args=[task.pk]),
+                {'title': ' '.join(rng.sample(WORDS, 3))},
+                content_type='application/json', **auth)
+
+        task_list = reverse('productivity_app:task-list')
+        return [
+            Endpoint(
+                'login',
+                lambda: post(reverse('productivity_app:login'), {
+                    'email': user.email, 'password': PASSWORD}),
+                200, slow=True),
+            Endpoint('register', register, 201, slow=True),
+            Endpoint(
+                'tasks-list', lambda: client.get(task_list, **auth), 200),
+            Endpoint(
+                'tasks-list-uncached',
+                lambda: client.get(task_list, **auth), 200,
+                setup=cache.clear),
+            Endpoint(
+                'tasks-list-sparse',
+                lambda: client.get(
+                    task_list, {'fields': 'id,title,status,due_date'},
+                    **auth),
+                200, setup=cache.clear),
+            Endpoint(
+                'task-detail',
+                lambda: client.get(reverse(
+                    'productivity_app:task-detail', args=[task.pk]),
+                    **auth),
+                200),
+            Endpoint(
+                'task-create',
+                lambda: post(task_list, {
+                    'title': 'Benchmark task',
+                    'description': 'Created by benchmark_api',
+                    'category': category.pk,
+                }, **auth),
+                201),
+            Endpoint('task-update', update_task, 200),
+            Endpoint(
+                'categories',
+                lambda: client.get(
+                    reverse('productivity_app:category-list')),
+                200),
+            Endpoint(
+                'users-list',
+                lambda: client.get(
+                    reverse('productivity_app:users-list'), **auth),
+                200),
+        ]
+
+    def run(self, endpoint, iterations, warmup):
+        counts = []
+
+        def call():
+            queries = 0
+
+            def count(execute, sql, params, many, context):
+                nonlocal queries
+                queries += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                response = endpoint.request()
+            if response.status_code != endpoint.status:
+                raise CommandError(
+                    f"{endpoint.name}: expected {endpoint.status}, got "
+                    f"{response.status_code}: {response.content[:200]!r}")
+            counts.append(queries)
+
+        samples = measure(call, iterations, warmup, setup=endpoint.setup)
+        stats = summarize(samples)
+        stats['queries'] = round(statistics.mean(counts[warmup:]), 1)
+        return stats
+
+    def check_baseline(self, options, results):
+        baseline = read_json(options['baseline'])['results']
+        found = regressions(
+            baseline, results, 'endpoint', options['tolerance'])
+        for row, _, reasons in found:
+            self.stderr.write(f"{row['endpoint']}: " + '; '.join(reasons))
+        if found:
+            raise CommandError(
+                f"{len(found)} endpoint(s) regressed against "
+                f"{options['baseline']}.")
+        self.stdout.write(f"No regressions against {options['baseline']}.")
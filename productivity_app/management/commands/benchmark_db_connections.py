@@ -0,0 +1,100 @@
+# productivity_app/management/commands/benchmark_db_connections.py
+import importlib.util
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from productivity_app.benchmarks import (
+    format_table,
+    measure,
+    summarize,
+    temporary_connection,
+    write_json,
+)
+
+COLUMNS = ['mode', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms',
+           'throughput_per_s', 'connects']
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database latency with a new connection per "
+        "request, with persistent connections, and (on PostgreSQL with "
+        "psycopg 3) with the connection pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument(
+            '--query',
+            default='SELECT id, name FROM productivity_app_category',
+            help="SQL run once per simulated request.",
+        )
+        parser.add_argument('--json', metavar='PATH',
+                            help="Also write the results to PATH.")
+
+    def handle(self, *args, **options):
+        default = connections.settings[DEFAULT_DB_ALIAS]
+        modes = [
+            ('new connection', {'CONN_MAX_AGE': 0}),
+            ('persistent', {'CONN_MAX_AGE': 600,
+                            'CONN_HEALTH_CHECKS': True}),
+        ]
+        if self.pool_available(default):
+            modes.append(('pool', {
+                'CONN_MAX_AGE': 0,
+                'OPTIONS': {**default.get('OPTIONS', {}),
+                            'pool': {'min_size': 2, 'max_size': 4}},
+            }))
+        else:
+            self.stderr.write(
+                "Skipping the pool: it needs PostgreSQL and psycopg 3 "
+                "with psycopg_pool.")
+
+        results = []
+        for mode, overrides in modes:
+            alias = 'benchmark_' + mode.replace(' ', '_')
+            with temporary_connection(alias, **overrides) as connection:
+                stats = self.run(connection, options)
+            results.append({'mode': mode, **stats})
+
+        self.stdout.write(format_table(results, COLUMNS))
+        if options['json']:
+            write_json(options['json'], 'db_connections', results)
+
+    def run(self, connection, options):
+        """Time simulated requests, counting how often Django connects."""
+        connects = 0
+        connect = connection.connect
+
+        def counting_connect():
+            nonlocal connects
+            connects += 1
+            connect()
+
+        connection.connect = counting_connect
+
+        def request():
+            # The same signals the handlers send around every request;
+            # request_finished closes connections older than
+            # CONN_MAX_AGE.
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute(options['query'])
+                cursor.fetchall()
+            request_finished.send(sender=self.__class__)
+
+        samples = measure(request, options['iterations'], options['warmup'])
+        stats = summarize(samples)
+        stats['connects'] = connects
+        return stats
+
+    @staticmethod
+    def pool_available(settings_dict):
+        return (
+            settings_dict['ENGINE'] == 'django.db.backends.postgresql'
+            and importlib.util.find_spec('psycopg') is not None
+            and importlib.util.find_spec('psycopg_pool') is not None
+        )
@@ -0,0 +1,73 @@
+# productivity_app/management/commands/benchmark_password_hashing.py
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+
+from productivity_app.benchmarks import (
+    format_table,
+    measure,
+    summarize,
+    write_json,
+)
+
+COLUMNS = ['iterations', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms',
+           'within_target']
+
+
+class Command(BaseCommand):
+    help = (
+        "Time password verification with several PBKDF2 iteration counts "
+        "and report which meet a p99 latency target, to help choose "
+        "PASSWORD_PBKDF2_ITERATIONS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--counts',
+            default='260000,600000,870000,1000000',
+            help="Comma-separated iteration counts to try. The current "
+                 "setting is always included.",
+        )
+        parser.add_argument('--samples', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--target-ms', type=float, default=250.0,
+            help="p99 budget for one password check, in milliseconds.",
+        )
+        parser.add_argument('--json', metavar='PATH',
+                            help="Also write the results to PATH.")
+
+    def handle(self, *args, **options):
+        hasher = get_hasher('pbkdf2_sha256')
+        counts = {int(count) for count in options['counts'].split(',')}
+        counts.add(settings.PASSWORD_PBKDF2_ITERATIONS)
+        password = 'correct horse battery staple'
+
+        results = []
+        for iterations in sorted(counts):
+            encoded = hasher.encode(password, hasher.salt(), iterations)
+            samples = measure(
+                lambda: hasher.verify(password, encoded),
+                options['samples'], options['warmup'])
+            stats = summarize(samples)
+            results.append({
+                **stats,
+                # summarize() counts samples under 'iterations'.
+                'samples': stats['iterations'],
+                'iterations': iterations,
+                'within_target': stats['p99_ms'] <= options['target_ms'],
+            })
+
+        self.stdout.write(format_table(results, COLUMNS))
+        fitting = [row['iterations'] for row in results
+                   if row['within_target']]
+        if fitting:
+            self.stdout.write(
+                f"Highest count within {options['target_ms']:g} ms p99: "
+                f"{max(fitting)} (current setting: "
+                f"{settings.PASSWORD_PBKDF2_ITERATIONS}).")
+        else:
+            self.stdout.write(
+                f"No count met the {options['target_ms']:g} ms p99 target.")
+        if options['json']:
+            write_json(options['json'], 'password_hashing', results)
@@ -0,0 +1,95 @@
+# productivity_app/management/commands/benchmark_task_serializers.py
+import json
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from productivity_app.benchmarks import (
+    format_table,
+    measure,
+    seed_data,
+    summarize,
+    throwaway_database,
+    write_json,
+)
+from productivity_app.models import Task
+from productivity_app.serializers import TaskReadSerializer, TaskSerializer
+
+COLUMNS = ['serializer', 'rows', 'mean_ms', 'p50_ms', 'p99_ms',
+           'rows_per_s', 'speedup']
+SERIALIZERS = {
+    'model': TaskSerializer,
+    'read': TaskReadSerializer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed tasks and time serializing them as one list with the full "
+        "TaskSerializer and with TaskReadSerializer, the read path of the "
+        "task endpoints. Rows are loaded once with their relations, so "
+        "only serialization is timed. Runs in a throwaway test database "
+        "unless --in-place is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--files-per-task', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--in-place', action='store_true',
+            help="Seed the configured database instead of a throwaway "
+                 "test database. Seeded rows are kept.")
+        parser.add_argument('--json', metavar='PATH',
+                            help="Also write the results to PATH.")
+
+    def handle(self, *args, **options):
+        with throwaway_database(not options['in_place']):
+            seed_data(
+                random.Random(options['seed']), options['users'], 0,
+                options['tasks'], options['files_per_task'])
+            tasks = list(Task.objects.with_related().order_by('id'))
+            results = self.benchmark(tasks, options)
+
+        self.stdout.write(format_table(results, COLUMNS))
+        if options['json']:
+            config = {
+                name: options[name] for name in (
+                    'tasks', 'users', 'files_per_task', 'iterations',
+                    'warmup', 'seed')
+            }
+            write_json(
+                options['json'], 'task_serializers', results, config)
+
+    def benchmark(self, tasks, options):
+        outputs = {
+            name: json.dumps(cls(tasks, many=True).data, default=str)
+            for name, cls in SERIALIZERS.items()
+        }
+        if outputs['read'] != outputs['model']:
+            raise CommandError(
+                "TaskReadSerializer output differs from TaskSerializer's.")
+
+        results = []
+        for name, cls in SERIALIZERS.items():
+            samples = measure(
+                lambda: cls(tasks, many=True).data,
+                options['iterations'], options['warmup'])
+            stats = summarize(samples)
+            results.append({
+                'serializer': name,
+                'rows': len(tasks),
+                **stats,
+                'rows_per_s': round(
+                    len(tasks) / stats['mean_ms'] * 1000)
+                if stats['mean_ms'] else 0,
+            })
+        baseline = results[0]['mean_ms']
+        for row in results:
+            row['speedup'] = (
+                round(baseline / row['mean_ms'], 1) if row['mean_ms']
+                else '-')
+        return results
@@ -0,0 +1,29 @@
+# productivity_app/management/commands/prune_task_tombstones.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from productivity_app.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete task tombstones older than TASK_TOMBSTONE_RETENTION_DAYS. "
+        "Clients with an older sync cursor receive a full snapshot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.TASK_TOMBSTONE_RETENTION_DAYS,
+            help="Keep tombstones from the last N days.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = TaskTombstone.objects.filter(
+            deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"Deleted {deleted} task tombstone(s).")
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Give Task.assigned_users an explicit through model backed by the
+    existing join table, then index it for per-user lookups.
+    """
+
+    dependencies = [
+        ('productivity_app', '0004_alter_file_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The table already exists; only teach the migration state
+        # about the model that now describes it.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='TaskAssignment',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='productivity_app.task')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_assignments', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'productivity_app_task_assigned_users',
+                        'unique_together': {('task', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='task',
+                    name='assigned_users',
+                    field=models.ManyToManyField(blank=True, related_name='assigned_tasks', through='productivity_app.TaskAssignment', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+            database_operations=[],
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['user', 'task'], name='task_assignment_user_idx'),
+        ),
+        # The single-column user index is a prefix of the one above.
+        migrations.AlterField(
+            model_name='taskassignment',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_assignments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date', 'id'], name='task_due_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity_app', '0005_taskassignment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
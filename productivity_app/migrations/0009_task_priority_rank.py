@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Task.PRIORITY_RANKS at the time of this migration.
+PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3}
+
+
+def fill_priority_rank(apps, schema_editor):
+    Task = apps.get_model('productivity_app', 'Task')
+    # One UPDATE per priority; rows default to medium's rank.
+    for priority, rank in PRIORITY_RANKS.items():
+        if rank != 2:
+            Task.objects.filter(priority=priority).update(priority_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity_app', '0008_task_overdue_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-due_date', '-priority_rank', 'status']},
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_due_date_id_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=2, editable=False),
+        ),
+        # Filled before the indexes below exist, so it doesn't maintain them.
+        migrations.RunPython(fill_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-due_date', '-priority_rank', 'status'], name='task_default_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date', '-priority_rank', 'id'], name='task_due_date_rank_idx'),
+        ),
+    ]
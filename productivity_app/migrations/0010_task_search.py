@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from productivity_app import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor.connection)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search for tasks: a generated tsvector column and GIN index
+    on PostgreSQL, an FTS5 table with sync triggers on SQLite. Raw SQL,
+    so the model state is unchanged (see productivity_app/search.py).
+    """
+
+    dependencies = [
+        ('productivity_app', '0009_task_priority_rank'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
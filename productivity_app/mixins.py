@@ -0,0 +1,138 @@
+# productivity_app/mixins.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag / Last-Modified validators to ``list`` and ``retrieve`` of
+    a viewset whose model has an ``updated_at`` field, and answers 304
+    before anything is serialized when the client's copy is current.
+
+    * Collections: max(updated_at) and row count of the filtered
+      queryset, one aggregate query. Only the ETag is compared, because
+      a deletion can leave max(updated_at) unchanged.
+    * Single objects: the object's ``updated_at``.
+
+    Set ``date_dependent`` when the representation also changes with the
+    date alone (a task's ``is_overdue``): the ETag then includes today's
+    date and Last-Modified is never before today's midnight.
+    """
+    date_dependent = False
+
+    def get_collection_validators(self, queryset):
+        stats = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'), count=Count('pk'))
+        last_modified = self._since_midnight(stats['last_modified'])
+        etag = self._make_etag(
+            self.request.get_full_path(),
+            last_modified.isoformat() if last_modified else '',
+            stats['count'],
+            *self._date_parts(),
+        )
+        return etag, last_modified
+
+    def get_object_validators(self, obj):
+        etag = self._make_etag(
+            obj.pk, obj.updated_at.isoformat(), *self._date_parts())
+        return etag, self._since_midnight(obj.updated_at)
+
+    def conditional_response(self, etag, last_modified, compare_date=True):
+        """Return a 304 response if the request's validators match."""
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            self.request,
+            etag=etag,
+            last_modified=timestamp if compare_date else None,
+        )
+        if response is not None:
+            response['ETag'] = etag
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        # Filtered once: the validators and the page share the queryset
+        # (filter validation can itself query, e.g. ?category=).
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = self.get_collection_validators(queryset)
+        not_modified = self.conditional_response(
+            etag, last_modified, compare_date=False)
+        if not_modified is not None:
+            return not_modified
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response(serializer.data)
+        return self.set_validators(response, etag, last_modified)
+
+    def cached_list(self, key, timeout, request, *args, **kwargs):
+        """
+        ``list``, served from the cache under ``key`` for ``timeout``
+        seconds. The cached entry keeps its validators, so a matching
+        If-None-Match gets a 304 without touching the database. Not
+        cached without a shared cache (settings.SHARED_CACHE), whose
+        invalidations would only reach this process.
+        """
+        if not (timeout and settings.SHARED_CACHE):
+            return ConditionalGetMixin.list(self, request, *args, **kwargs)
+        entry = cache.get(key)
+        if entry is None:
+            response = ConditionalGetMixin.list(
+                self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = {
+                    name: response[name]
+                    for name in ('ETag', 'Last-Modified') if name in response
+                }
+                cache.set(key, {'data': response.data, 'headers': headers},
+                          timeout)
+            return response
+        not_modified = self.conditional_response(
+            entry['headers']['ETag'], None, compare_date=False)
+        if not_modified is not None:
+            return not_modified
+        return Response(entry['data'], headers=entry['headers'])
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+        not_modified = self.conditional_response(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return self.set_validators(
+            Response(serializer.data), etag, last_modified)
+
+    def _date_parts(self):
+        if not self.date_dependent:
+            return ()
+        return (timezone.now().date().isoformat(),)
+
+    def _since_midnight(self, last_modified):
+        if not self.date_dependent or last_modified is None:
+            return last_modified
+        midnight = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        return max(last_modified, midnight)
+
+    @staticmethod
+    def _make_etag(*parts):
+        digest = hashlib.sha1(
+            ':'.join(str(part) for part in parts).encode()).hexdigest()
+        return f'"{digest}"'
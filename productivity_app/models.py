@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Count, Prefetch, Q
 from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save, post_migrate
 from django.dispatch import receiver
@@ -64,6 +65,144 @@ def create_default_categories(sender, **kwargs):
 # ----------------------------------------------------------------------
 # Task
 # ----------------------------------------------------------------------
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else 0.0
+
+
+# Task columns behind each field of the task serializers, for only().
+TASK_FIELD_COLUMNS = {
+    'id': ('id',),
+    'title': ('title',),
+    'description': ('description',),
+    'due_date': ('due_date',),
+    'priority': ('priority',),
+    'category': ('category',),
+    'status': ('status',),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+    'is_overdue': ('due_date', 'status'),
+}
+
+
+class TaskQuerySet(models.QuerySet):
+    def assigned_to(self, user):
+        """
+        Tasks the given user is assigned to.
+
+        Filters on the (user, task) index of TaskAssignment. Each pair is
+        unique, so the join cannot repeat a task and needs no DISTINCT.
+        """
+        return self.filter(assignments__user_id=user.pk)
+
+    def overdue(self, overdue=True, today=None):
+        """
+        Tasks past their due date and not done (or, with ``overdue=False``,
+        all others). Served by the partial index ``task_overdue_idx``.
+        """
+        condition = Task.overdue_condition(today)
+        return self.filter(condition) if overdue else self.exclude(condition)
+
+    def touch(self):
+        """
+        Bump updated_at without saving each row, e.g. when a task's files
+        or assignees change, so ETags and delta sync see the change.
+        """
+        return self.update(updated_at=timezone.now())
+
+    def stats(self):
+        """
+        Counts per status, priority and category, overdue and done
+        totals, and completion rates, from one GROUP BY query.
+        """
+        rows = self.order_by().values(
+            'status', 'priority', 'category_id', 'category__name',
+        ).annotate(
+            count=Count('pk'),
+            overdue=Count('pk', filter=Task.overdue_condition()),
+        )
+        by_status = dict.fromkeys(dict(Task.STATUS_CHOICES), 0)
+        by_priority = dict.fromkeys(dict(Task.PRIORITY_CHOICES), 0)
+        by_category = {}
+        overdue = 0
+        for row in rows:
+            by_status[row['status']] += row['count']
+            by_priority[row['priority']] += row['count']
+            overdue += row['overdue']
+            category = by_category.setdefault(row['category_id'], {
+                'id': row['category_id'],
+                'name': row['category__name'],
+                'total': 0,
+                'done': 0,
+            })
+            category['total'] += row['count']
+            if row['status'] == 'done':
+                category['done'] += row['count']
+
+        for category in by_category.values():
+            category['completion_rate'] = _rate(
+                category['done'], category['total'])
+        total = sum(by_status.values())
+        return {
+            'total': total,
+            'done': by_status['done'],
+            'overdue': overdue,
+            'completion_rate': _rate(by_status['done'], total),
+            'by_status': by_status,
+            'by_priority': by_priority,
+            'by_category': sorted(
+                by_category.values(),
+                key=lambda c: (c['name'] is None, c['name'] or '')),
+        }
+
+    def with_related(self, fields=None, expand=()):
+        """
+        Load everything TaskSerializer reads in a fixed number of queries:
+        assigned user ids and files are prefetched.
+
+        ``fields`` and ``expand`` are the requested sparse fieldset (see
+        serializers.requested_fieldset): relations outside ``fields`` are
+        not prefetched, an expanded category is joined and expanded
+        assigned users are loaded with their names and emails.
+        """
+        def wanted(name):
+            return fields is None or name in fields
+
+        queryset = self
+        if wanted('category') and 'category' in expand:
+            queryset = queryset.select_related('category')
+        if wanted('assigned_users'):
+            columns = ['id']
+            if 'assigned_users' in expand:
+                columns += ['username', 'email']
+            queryset = queryset.prefetch_related(Prefetch(
+                'assigned_users', queryset=User.objects.only(*columns)))
+        if wanted('upload_files'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'upload_files',
+                queryset=File.objects.order_by('uploaded_at', 'id')
+            ))
+        return queryset
+
+    def only_fields(self, fields, expand=(), keep=()):
+        """
+        Load only the columns the serializer ``fields`` read, plus ``id``,
+        ``updated_at`` (for ETags) and the ``keep`` column names, e.g. the
+        ordering a cursor page is built from.
+        """
+        concrete = {
+            name: field.name
+            for field in self.model._meta.concrete_fields
+            for name in (field.name, field.attname)
+        }
+        columns = {'id', 'updated_at'}
+        columns.update(concrete[name] for name in keep if name in concrete)
+        for name in fields:
+            columns.update(TASK_FIELD_COLUMNS.get(name, ()))
+        if 'category' in fields and 'category' in expand:
+            columns.update(('category__id', 'category__name'))
+        return self.only(*columns)
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -75,12 +214,17 @@ class Task(models.Model):
         ('medium', 'Medium'),
         ('high', 'High'),
     ]
+    # Sort keys for PRIORITY_CHOICES; the labels sort wrongly as strings.
+    PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3}
 
     title = models.CharField(max_length=255)
     description = models.TextField()
     due_date = models.DateField(null=True, blank=True)
     priority = models.CharField(
         max_length=20, choices=PRIORITY_CHOICES, default='medium')
+    # Derived from priority in save(); order by this, not by priority.
+    priority_rank = models.PositiveSmallIntegerField(
+        default=2, editable=False)
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
@@ -91,7 +235,11 @@ class Task(models.Model):
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default='pending')
     assigned_users = models.ManyToManyField(
-        User, related_name='assigned_tasks', blank=True)
+        User,
+        through='TaskAssignment',
+        related_name='assigned_tasks',
+        blank=True
+    )
     created_by = models.ForeignKey(
         User,
         related_name='created_tasks',
@@ -102,8 +250,46 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
-        ordering = ['-due_date', '-priority', 'status']
+        ordering = ['-due_date', '-priority_rank', 'status']
+        indexes = [
+            models.Index(
+                fields=['-due_date', '-priority_rank', 'status'],
+                name='task_default_order_idx',
+            ),
+            # Matches TaskCursorPagination's ordering.
+            models.Index(
+                fields=['due_date', '-priority_rank', 'id'],
+                name='task_due_date_rank_idx',
+            ),
+            # Overdue lists and counts only ever read unfinished tasks.
+            models.Index(
+                fields=['due_date'],
+                condition=~Q(status='done'),
+                name='task_overdue_idx',
+            ),
+            # TaskFilterSet: an equality filter followed by the list's
+            # default ordering.
+            models.Index(
+                fields=['status', 'due_date', '-priority_rank', 'id'],
+                name='task_status_due_idx',
+            ),
+            models.Index(
+                fields=['priority_rank', 'due_date', 'id'],
+                name='task_priority_due_idx',
+            ),
+            models.Index(
+                fields=['category', 'due_date', '-priority_rank', 'id'],
+                name='task_category_due_idx',
+            ),
+            models.Index(
+                fields=['created_at', 'id'], name='task_created_at_id_idx'),
+            # Range scans for delta sync (see TaskViewSet.sync).
+            models.Index(
+                fields=['updated_at', 'id'], name='task_updated_at_id_idx'),
+        ]
 
     def clean(self):
         if self.due_date and self.due_date < timezone.now().date():
@@ -111,8 +297,19 @@ class Task(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
+        self.priority_rank = self.PRIORITY_RANKS[self.priority]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'priority_rank'}
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def overdue_condition(today=None):
+        """The ``is_overdue`` rule as a Q, for TaskQuerySet."""
+        if today is None:
+            today = timezone.now().date()
+        return Q(due_date__lt=today) & ~Q(status='done')
+
     @property
     def is_overdue(self):
         if self.due_date and self.status != 'done':
@@ -123,14 +320,92 @@ class Task(models.Model):
         return self.title
 
 
+# ----------------------------------------------------------------------
+# Task assignment – explicit through table for Task.assigned_users
+# ----------------------------------------------------------------------
+class TaskAssignment(models.Model):
+    """
+    One row per (task, user) pair. Reuses the table Django created for
+    the implicit M2M, adding a (user, task) index so "my tasks" is an
+    index-only scan.
+    """
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='assignments')
+    # Covered by the (user, task) index below.
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='task_assignments',
+        db_index=False
+    )
+
+    class Meta:
+        db_table = 'productivity_app_task_assigned_users'
+        unique_together = [('task', 'user')]
+        indexes = [
+            models.Index(
+                fields=['user', 'task'], name='task_assignment_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.task_id}"
+
+
+# ----------------------------------------------------------------------
+# Task tombstone – deletions and unassignments for delta sync
+# ----------------------------------------------------------------------
+class TaskTombstone(models.Model):
+    """
+    Records that ``task_id`` left ``user``'s task list, either because
+    the task was deleted or because the user was unassigned. Rows older
+    than TASK_TOMBSTONE_RETENTION_DAYS are removed by the
+    ``prune_task_tombstones`` command.
+    """
+    # Plain integer: the task row is usually gone.
+    task_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='task_tombstones')
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'deleted_at'],
+                name='task_tombstone_user_idx'),
+        ]
+
+    @classmethod
+    def record(cls, pairs):
+        """Insert one tombstone per ``(task_id, user_id)`` pair."""
+        now = timezone.now()
+        return cls.objects.bulk_create(
+            [cls(task_id=task_id, user_id=user_id, deleted_at=now)
+             for task_id, user_id in pairs],
+            batch_size=1000,
+        )
+
+    def __str__(self):
+        return f"{self.task_id} left {self.user_id}"
+
+
 # ----------------------------------------------------------------------
 # File Upload
 # ----------------------------------------------------------------------
 class File(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     task = models.ForeignKey(
         Task, related_name='upload_files', on_delete=models.CASCADE)
     # Official Cloudinary field – stores files in your Cloudinary account
     file = CloudinaryField('file', folder='task_files')
+    # Public URL, filled in by the background uploader (see uploads.py)
+    url = models.CharField(max_length=500, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='ready')
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -0,0 +1,226 @@
+# productivity_app/pagination.py
+import datetime
+import decimal
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on the *whole* ordering instead of only
+    its first column.
+
+    DRF's CursorPagination filters on the first ordering field and falls
+    back to OFFSET for ties, and it breaks on nullable columns such as
+    ``Task.due_date``. Here the cursor stores one value per ordering
+    column and each page is fetched with a
+    ``(a, b, id) > (x, y, z)`` style predicate, so every page costs the
+    same index range scan no matter how deep the client pages.
+
+    NULLs sort as the largest value (PostgreSQL's default), which keeps
+    the ORDER BY compatible with a plain btree index on Postgres.
+    """
+    ordering = ('id',)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.nullable = self._get_nullable_fields(queryset.model)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor.reverse, self.cursor.position
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = queryset.order_by(*self._order_by(ordering))
+
+        if position is not None:
+            try:
+                queryset = queryset.filter(
+                    self._seek_filter(ordering, position))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # Fetch one extra row to find out whether another page follows.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering with ``id`` appended as a unique tie-breaker.
+
+        An ordering applied by the view's filters (``?ordering=``, search
+        ranking) takes precedence over the class default.
+        """
+        ordering = tuple(queryset.query.order_by)
+        if not ordering or not all(isinstance(f, str) for f in ordering):
+            ordering = super().get_ordering(request, queryset, view)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('id',)
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(
+            self.page[-1], self.ordering)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(
+            self.page[0], self.ordering)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+        try:
+            position = json.loads(cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if isinstance(instance, dict):
+                values.append(instance[name])
+                continue
+            # Follow related lookups such as ``user__username``.
+            value = instance
+            for part in name.split(LOOKUP_SEP):
+                value = None if value is None else getattr(value, part)
+            values.append(value)
+        return json.dumps(values, default=_encode_value)
+
+    def _get_nullable_fields(self, model):
+        nullable = set()
+        for field in self.ordering:
+            name = field.lstrip('-')
+            opts = model._meta
+            try:
+                for part in name.split(LOOKUP_SEP):
+                    model_field = opts.get_field(part)
+                    if model_field.null:
+                        nullable.add(name)
+                    if model_field.related_model is not None:
+                        opts = model_field.related_model._meta
+            except FieldDoesNotExist:
+                # Annotations are never NULL in our orderings.
+                pass
+        return nullable
+
+    def _invert(self, field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    def _order_by(self, ordering):
+        for field in ordering:
+            name = field.lstrip('-')
+            if name not in self.nullable:
+                yield field
+            elif field.startswith('-'):
+                yield F(name).desc(nulls_first=True)
+            else:
+                yield F(name).asc(nulls_last=True)
+
+    def _seek_filter(self, ordering, position):
+        """
+        Build ``c1 > v1 OR (c1 = v1 AND c2 > v2) OR ...`` for the ordering.
+        """
+        clauses = []
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            after = self._after(name, field.startswith('-'), value)
+            if after is not None:
+                clauses.append(equal & after)
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+            else:
+                equal &= Q(**{name: value})
+        if not clauses:
+            return Q(pk__in=[])
+        return reduce(or_, clauses)
+
+    def _after(self, name, descending, value):
+        """Rows strictly after ``value`` in a single column."""
+        nullable = name in self.nullable
+        if descending:
+            if value is None:
+                return Q(**{f'{name}__isnull': False})
+            return Q(**{f'{name}__lt': value})
+        if value is None:
+            return None
+        after = Q(**{f'{name}__gt': value})
+        if nullable:
+            after |= Q(**{f'{name}__isnull': True})
+        return after
+
+
+class TaskCursorPagination(KeysetCursorPagination):
+    """
+    Tasks are paged by due date, soonest first, then by priority,
+    highest first. Served by the task_due_date_rank_idx index.
+    """
+    ordering = ('due_date', '-priority_rank', 'id')
+
+
+class TaskSyncPagination(KeysetCursorPagination):
+    """
+    Pages ``changed`` of /api/tasks/sync/ in update order. Saving a task
+    moves it past every page already served, so tasks edited while a
+    client pages show up again later instead of being skipped.
+    """
+    ordering = ('updated_at', 'id')
+    cursor_query_param = 'page'
+    page_size = getattr(settings, 'TASK_SYNC_PAGE_SIZE', 500)
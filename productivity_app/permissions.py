@@ -1,6 +1,28 @@
 # productivity_app/permissions.py
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .models import TaskAssignment
+
+
+def is_assigned(request, task):
+    """
+    Whether ``request.user`` is assigned to ``task``.
+
+    One EXISTS query on the (task, user) unique index, memoized on the
+    request so the permission class and the view hooks share it.
+    """
+    user = request.user
+    if not (user and user.is_authenticated):
+        return False
+    checked = getattr(request, '_task_assignments', None)
+    if checked is None:
+        checked = request._task_assignments = {}
+    key = (task.pk, user.pk)
+    if key not in checked:
+        checked[key] = TaskAssignment.objects.filter(
+            task_id=task.pk, user_id=user.pk).exists()
+    return checked[key]
+
 
 class IsAssignedOrReadOnly(BasePermission):
     """
@@ -18,7 +40,7 @@ class IsAssignedOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
-        return request.user in obj.assigned_users.all()
+        return is_assigned(request, obj)
 
 
 class IsSelfOrReadOnly(BasePermission):
@@ -42,4 +64,5 @@ class IsOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
-        return obj.user == request.user
+        # By id, so the related user row is never loaded.
+        return obj.user_id == request.user.pk
@@ -0,0 +1,210 @@
+# productivity_app/search.py
+"""
+Full-text search over task titles and descriptions.
+
+* PostgreSQL: a generated ``search_vector`` tsvector column (title
+  weighted above description) with a GIN index. The database keeps it
+  current on every INSERT/UPDATE, including bulk writes.
+* SQLite (development and tests): an FTS5 external-content table kept in
+  sync by triggers.
+
+Neither is part of the Django model state; both are installed by
+migration 0010 and queried with raw SQL fragments from ``search_tasks``.
+"""
+import re
+
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+TASK_TABLE = 'productivity_app_task'
+FTS_TABLE = 'productivity_app_task_fts'
+MARK_START = '<mark>'
+MARK_END = '</mark>'
+# The database marks matches with these control characters; the text is
+# HTML-escaped before they are turned into <mark> tags.
+SELECTION_START = '\x02'
+SELECTION_END = '\x03'
+
+POSTGRES_INSTALL = [
+    f"""
+    ALTER TABLE {TASK_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS task_search_vector_idx
+    ON {TASK_TABLE} USING GIN (search_vector)
+    """,
+]
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS task_search_vector_idx",
+    f"ALTER TABLE {TASK_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='{TASK_TABLE}', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, description ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+SQLITE_TRIGGERS = {f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'}
+
+
+def _statements(vendor, install):
+    if vendor == 'postgresql':
+        return POSTGRES_INSTALL if install else POSTGRES_UNINSTALL
+    if vendor == 'sqlite':
+        return SQLITE_INSTALL if install else SQLITE_UNINSTALL
+    return []
+
+
+def install(connection):
+    """Create the search column/table for ``connection``'s backend."""
+    with connection.cursor() as cursor:
+        for sql in _statements(connection.vendor, install=True):
+            cursor.execute(sql)
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        for sql in _statements(connection.vendor, install=False):
+            cursor.execute(sql)
+
+
+def ensure_installed(connection):
+    """
+    Reinstall the SQLite triggers if a table rebuild dropped them.
+
+    SQLite migrations that alter the task table copy it to a new one,
+    which silently drops its triggers (the FTS table itself survives).
+    """
+    if connection.vendor != 'sqlite':
+        return
+    tables = connection.introspection.table_names()
+    if TASK_TABLE not in tables or FTS_TABLE not in tables:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = %s", [TASK_TABLE])
+        if SQLITE_TRIGGERS <= {row[0] for row in cursor.fetchall()}:
+            return
+    install(connection)
+
+
+class HighlightField(TextField):
+    """Task text with its matches marked, as HTML-escaped <mark> markup."""
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return escape(value).replace(
+            SELECTION_START, MARK_START).replace(SELECTION_END, MARK_END)
+
+
+def _fts5_query(text):
+    """Quote each word so user input can't use FTS5 query syntax."""
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', text))
+
+
+def search_tasks(queryset, text, connection):
+    """
+    Tasks in ``queryset`` matching ``text``, best match first.
+
+    Each task is annotated with ``search_rank`` (higher is better) and
+    ``title_highlight`` / ``description_highlight``, the HTML-escaped
+    text with the matched terms wrapped in <mark> tags.
+    """
+    task = f'"{TASK_TABLE}"'
+    if connection.vendor == 'postgresql':
+        tsquery = "websearch_to_tsquery('english', %s)"
+        marks = f'StartSel="{SELECTION_START}", StopSel="{SELECTION_END}"'
+        queryset = queryset.filter(RawSQL(
+            f'{task}."search_vector" @@ {tsquery}', [text],
+            output_field=BooleanField(),
+        )).annotate(
+            # ts_rank_cd() is a float4; as a double the rank round-trips
+            # through the pagination cursor and compares equal again.
+            search_rank=RawSQL(
+                f'ts_rank_cd({task}."search_vector", {tsquery})'
+                f'::double precision',
+                [text], output_field=FloatField()),
+            title_highlight=RawSQL(
+                f"ts_headline('english', {task}.\"title\", {tsquery}, %s)",
+                [text, f'{marks}, HighlightAll=true'],
+                output_field=HighlightField()),
+            description_highlight=RawSQL(
+                f"ts_headline('english', {task}.\"description\", "
+                f"{tsquery}, %s)",
+                [text, f'{marks}, MaxFragments=2, MaxWords=20, MinWords=5'],
+                output_field=HighlightField()),
+        )
+    elif connection.vendor == 'sqlite':
+        match = _fts5_query(text)
+        if not match:
+            return queryset.none()
+        fts = f'"{FTS_TABLE}"'
+
+        def fts_value(expression, params, output_field):
+            return RawSQL(
+                f'SELECT {expression} FROM {fts} WHERE {fts} MATCH %s '
+                f'AND {fts}.rowid = {task}."id"',
+                [*params, match], output_field=output_field,
+            )
+
+        marks = [SELECTION_START, SELECTION_END]
+        queryset = queryset.filter(RawSQL(
+            f'{task}."id" IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)',
+            [match], output_field=BooleanField(),
+        )).annotate(
+            # bm25() is lower for better matches; titles weigh 10x.
+            search_rank=fts_value(
+                f'-bm25({fts}, 10.0, 1.0)', [], FloatField()),
+            title_highlight=fts_value(
+                f"highlight({fts}, 0, %s, %s)", marks, HighlightField()),
+            description_highlight=fts_value(
+                f"snippet({fts}, 1, %s, %s, '…', 24)", marks,
+                HighlightField()),
+        )
+    else:
+        # Unindexed fallback for other backends.
+        return queryset.filter(
+            Q(title__icontains=text) | Q(description__icontains=text))
+    return queryset.order_by('-search_rank', 'id')
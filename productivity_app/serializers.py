@@ -1,13 +1,94 @@
 # productivity_app/serializers.py
+from copy import copy
+from functools import cached_property
+
 from rest_framework import serializers
+from rest_framework.exceptions import Throttled
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
-from .models import Profile, Task, File, Category
-import cloudinary.uploader
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+from .auth.backends import (
+    LoginRateLimited, check_credentials, users_by_email
+)
+from .cache import invalidate_task_lists
+from .events import publish_task_changes, publish_task_removals
+from .models import (
+    Profile, Task, TaskAssignment, TaskTombstone, File, Category
+)
+from .signals import suspend_task_signals
+from .uploads import queue_uploads
 
 User = get_user_model()
 
 
+# ──────────────────────────────
+#  Sparse fieldsets
+# ──────────────────────────────
+def requested_fieldset(request):
+    """
+    ``?fields=a,b`` and ``?expand=c`` of ``request`` as a (fields,
+    expand) pair of frozensets. ``fields`` is None when not given, i.e.
+    every field is wanted. Unknown names are ignored.
+    """
+    params = getattr(request, "query_params", None) or {}
+
+    def names(param):
+        return frozenset(
+            name.strip() for name in params.get(param, "").split(",")
+            if name.strip())
+
+    return names("fields") or None, names("expand")
+
+
+class SparseFieldsMixin:
+    """
+    Honours ``?fields=`` and ``?expand=`` in the output of the top-level
+    serializer of a response (or of each item of a list); nested
+    serializers always render in full. ``fields`` picks the keys,
+    ``expand`` swaps the fields named in ``get_expandable_fields()`` for
+    nested objects. Only the output changes: input is validated as usual.
+    """
+
+    def get_expandable_fields(self):
+        """Field name -> unbound read-only serializer to render it with."""
+        return {}
+
+    @cached_property
+    def fieldset(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return None, frozenset()
+        return requested_fieldset(self.context.get("request"))
+
+    @cached_property
+    def _sparse_readable_fields(self):
+        fields, expand = self.fieldset
+        expanded = {}
+        for name, field in self.get_expandable_fields().items():
+            if name in expand:
+                field.bind(name, self)
+                expanded[name] = field
+        readable = [
+            expanded.pop(field.field_name, field)
+            for field in super()._readable_fields
+        ]
+        # Expansions without a plain counterpart come last.
+        readable.extend(expanded.values())
+        return [
+            field for field in readable
+            if fields is None or field.field_name in fields
+        ]
+
+    @property
+    def _readable_fields(self):
+        return self._sparse_readable_fields
+
+
 # ──────────────────────────────
 #  Register / Login
 # ──────────────────────────────
@@ -29,7 +110,7 @@ class RegisterSerializer(serializers.ModelSerializer):
                 {"password": "Passwords must match."})
         attrs.pop("confirm_password")
         validate_password(attrs["password"], User(**attrs))
-        if User.objects.filter(email=attrs["email"]).exists():
+        if users_by_email(attrs["email"]).exists():
             raise serializers.ValidationError(
                 {"email": "Email already taken."})
         if User.objects.filter(username=attrs["username"]).exists():
@@ -47,10 +128,12 @@ class LoginSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         try:
-            user = User.objects.get(email=attrs["email"])
-        except User.DoesNotExist:
-            raise serializers.ValidationError("Invalid credentials.")
-        if not user.check_password(attrs["password"]):
+            user = check_credentials(
+                self.context.get("request"),
+                attrs["email"], attrs["password"])
+        except LoginRateLimited as exc:
+            raise Throttled(wait=exc.wait)
+        if user is None:
             raise serializers.ValidationError("Invalid credentials.")
         attrs["user"] = user
         return attrs
@@ -59,13 +142,16 @@ class LoginSerializer(serializers.Serializer):
 # ──────────────────────────────
 #  User / Profile
 # ──────────────────────────────
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email"]
 
+    def get_expandable_fields(self):
+        return {"profile": ProfileSerializer(read_only=True)}
 
-class ProfileSerializer(serializers.ModelSerializer):
+
+class ProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source="user.username", read_only=True)
     user_email = serializers.EmailField(source="user.email", read_only=True)
 
@@ -73,32 +159,38 @@ class ProfileSerializer(serializers.ModelSerializer):
         model = Profile
         fields = ["id", "user_name", "user_email", "created_at", "updated_at"]
 
+    def get_expandable_fields(self):
+        return {"user": UserSerializer(read_only=True)}
+
 
 # ──────────────────────────────
-#  File – Cloudinary Upload
+#  File – queued Cloudinary Upload
 # ──────────────────────────────
+def file_url(obj):
+    if obj.url:
+        return obj.url
+    return obj.file.url if obj.file else None
+
+
 class FileSerializer(serializers.ModelSerializer):
     file = serializers.FileField(write_only=True, required=False)
     file_url = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = File
-        fields = ["id", "file", "file_url", "uploaded_at"]
+        fields = ["id", "file", "file_url", "status", "uploaded_at"]
+        read_only_fields = ["status"]
 
     def get_file_url(self, obj):
-        return obj.file.url if obj.file else None
+        return file_url(obj)
 
     def create(self, validated_data):
         task = self.context["task"]
         uploaded_file = validated_data.pop("file", None)
         if uploaded_file:
-            result = cloudinary.uploader.upload(
-                uploaded_file, folder="task_files")
-            cloudinary_url = result["secure_url"]
-            file_obj = File.objects.create(task=task, file=cloudinary_url)
-        else:
-            file_obj = File.objects.create(task=task)
-        return file_obj
+            # Stored as pending; the upload finishes in the background.
+            return queue_uploads(task, [uploaded_file])[0]
+        return File.objects.create(task=task)
 
 
 # ──────────────────────────────
@@ -110,10 +202,21 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
+def run_task_clean(task):
+    """
+    Run Task.clean() and re-raise its errors as a DRF ValidationError so
+    they end up in ``non_field_errors`` instead of a 500.
+    """
+    try:
+        task.clean()
+    except DjangoValidationError as exc:
+        raise serializers.ValidationError(exc.messages)
+
+
 # ──────────────────────────────
-#  Task – Full Create / Update (FIXED: full_clean added)
+#  Task – Full Create / Update
 # ──────────────────────────────
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     assigned_users = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), many=True, required=False
     )
@@ -136,22 +239,32 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_at", "updated_at", "is_overdue"]
 
+    def get_expandable_fields(self):
+        return {
+            "category": CategorySerializer(read_only=True),
+            "assigned_users": UserSerializer(many=True, read_only=True),
+        }
+
+    def validate(self, attrs):
+        # Model rules (past due_date, etc.) are checked here, once;
+        # Task.save() still runs full_clean() as a safety net.
+        task = copy(self.instance) if self.instance else Task()
+        for attr, value in attrs.items():
+            if attr not in ("assigned_users", "new_files"):
+                setattr(task, attr, value)
+        run_task_clean(task)
+        return attrs
+
     def create(self, validated_data):
         new_files = validated_data.pop("new_files", [])
         users = validated_data.pop("assigned_users", [])
 
-        # Create task instance
         task = Task(**validated_data)
-
-        # Run model validation (past due_date, etc.)
-        task.full_clean()
-
         task.save()
         task.assigned_users.set(users)
 
         # Handle file uploads
-        for f in new_files:
-            FileSerializer(context={"task": task}).create({"file": f})
+        queue_uploads(task, new_files)
 
         return task
 
@@ -162,47 +275,338 @@ class TaskSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        # Validate before saving
-        instance.full_clean()
-
         instance.save()
 
         if users is not None:
             instance.assigned_users.set(users)
 
-        for f in new_files:
-            FileSerializer(context={"task": instance}).create({"file": f})
+        queue_uploads(instance, new_files)
 
         return instance
 
 
 # ──────────────────────────────
-#  List & Detail
+#  Task – Bulk create / update / delete
 # ──────────────────────────────
-class TaskListSerializer(serializers.ModelSerializer):
-    category = serializers.CharField(source="category.name")
+class TaskBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One task in a bulk request. Relations are plain ids here and are
+    resolved for the whole batch at once by TaskBulkSerializer.
+    """
+    category = serializers.IntegerField()
+    assigned_users = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
 
     class Meta:
         model = Task
-        fields = ["id", "title", "description", "due_date", "priority",
-                  "category", "status", "created_at", "updated_at"]
+        fields = [
+            "title", "description", "due_date", "priority",
+            "category", "status", "assigned_users"
+        ]
+
 
+class TaskBulkUpdateItemSerializer(TaskBulkItemSerializer):
+    id = serializers.IntegerField()
+    category = serializers.IntegerField(required=False)
 
-class TaskDetailSerializer(serializers.ModelSerializer):
-    assigned_users = UserSerializer(many=True)
-    assigned_user_ids = serializers.PrimaryKeyRelatedField(
-        source="assigned_users",
-        queryset=User.objects.all(),
-        many=True,
-        write_only=True
+    class Meta(TaskBulkItemSerializer.Meta):
+        fields = ["id"] + TaskBulkItemSerializer.Meta.fields
+        extra_kwargs = {
+            "title": {"required": False},
+            "description": {"required": False},
+        }
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Validates and applies many task operations in one transaction:
+
+        {"create": [{...}], "update": [{"id": 1, ...}], "delete": [2, 3]}
+
+    Errors are reported per item, in the same positions as the request.
+    Either every operation is applied or none is. Writes use
+    bulk_create/bulk_update and a single insert into the assignment
+    table, so cost grows with the batch size rather than per task.
+    """
+
+    def get_fields(self):
+        # Declared here because the field names shadow Serializer.create()
+        # and Serializer.update() as class attributes.
+        return {
+            "create": TaskBulkItemSerializer(many=True, required=False),
+            "update": TaskBulkUpdateItemSerializer(many=True, required=False),
+            "delete": serializers.ListField(
+                child=serializers.IntegerField(), required=False
+            ),
+        }
+
+    def validate(self, attrs):
+        creates = attrs.get("create", [])
+        updates = attrs.get("update", [])
+        deletes = attrs.get("delete", [])
+        user = self.context["request"].user
+
+        total = len(creates) + len(updates) + len(deletes)
+        if not total:
+            raise serializers.ValidationError("No operations given.")
+        if total > settings.TASK_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"At most {settings.TASK_BULK_MAX_ITEMS} operations "
+                "per request."
+            )
+
+        # Resolve every referenced row with one query per table.
+        items = creates + updates
+        category_ids = set(Category.objects.filter(
+            pk__in={i["category"] for i in items if "category" in i}
+        ).values_list("pk", flat=True))
+        user_ids = set(User.objects.filter(
+            pk__in={u for i in items for u in i.get("assigned_users", [])}
+        ).values_list("pk", flat=True))
+        tasks = Task.objects.assigned_to(user).in_bulk(
+            [i["id"] for i in updates] + deletes)
+
+        seen = set()
+
+        def check_task_id(task_id):
+            if task_id not in tasks:
+                return "Task not found."
+            if task_id in seen:
+                return "Task appears more than once in this request."
+            seen.add(task_id)
+            return None
+
+        def check_item(item, task):
+            errors = {}
+            if "category" in item and item["category"] not in category_ids:
+                errors["category"] = ["Invalid category."]
+            missing = set(item.get("assigned_users", [])) - user_ids
+            if missing:
+                errors["assigned_users"] = [
+                    f"Invalid user id {pk}." for pk in sorted(missing)]
+            for attr, value in item.items():
+                if attr == "category":
+                    task.category_id = value
+                elif attr not in ("id", "assigned_users"):
+                    setattr(task, attr, value)
+            # bulk_create/bulk_update bypass Task.save().
+            task.priority_rank = Task.PRIORITY_RANKS.get(
+                task.priority, task.priority_rank)
+            try:
+                run_task_clean(task)
+            except serializers.ValidationError as exc:
+                errors["non_field_errors"] = exc.detail
+            return errors
+
+        create_errors, new_tasks = [], []
+        for item in creates:
+            task = Task(created_by_id=user.pk)
+            create_errors.append(check_item(item, task))
+            new_tasks.append(task)
+
+        update_errors, changed_tasks = [], []
+        for item in updates:
+            error = check_task_id(item["id"])
+            if error:
+                update_errors.append({"id": [error]})
+                continue
+            task = tasks[item["id"]]
+            update_errors.append(check_item(item, task))
+            changed_tasks.append(task)
+
+        delete_errors = []
+        for pk in deletes:
+            error = check_task_id(pk)
+            delete_errors.append([error] if error else [])
+
+        if any(create_errors + update_errors + delete_errors):
+            raise serializers.ValidationError({
+                "create": create_errors,
+                "update": update_errors,
+                "delete": delete_errors,
+            })
+
+        attrs["new_tasks"] = new_tasks
+        attrs["changed_tasks"] = changed_tasks
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        user = self.context["request"].user
+        creates = validated_data.get("create", [])
+        updates = validated_data.get("update", [])
+        deletes = validated_data.get("delete", [])
+        new_tasks = validated_data["new_tasks"]
+        changed_tasks = validated_data["changed_tasks"]
+
+        Task.objects.bulk_create(new_tasks, batch_size=1000)
+
+        if changed_tasks:
+            fields = {"updated_at"}
+            for item in updates:
+                fields.update(
+                    "category_id" if attr == "category" else attr
+                    for attr in item if attr not in ("id", "assigned_users")
+                )
+            if "priority" in fields:
+                fields.add("priority_rank")
+            now = timezone.now()
+            for task in changed_tasks:
+                task.updated_at = now
+            Task.objects.bulk_update(
+                changed_tasks, sorted(fields), batch_size=1000)
+
+        # Assignments: the creator when none are given, as in the
+        # single-task endpoint. Updates replace the listed tasks' users.
+        new_pairs = set()
+        for task, item in zip(new_tasks, creates):
+            for user_id in item.get("assigned_users") or [user.pk]:
+                new_pairs.add((task.pk, user_id))
+        reassigned = set()
+        for task, item in zip(changed_tasks, updates):
+            if "assigned_users" in item:
+                reassigned.add(task.pk)
+                new_pairs.update(
+                    (task.pk, user_id) for user_id in item["assigned_users"])
+        old_pairs = set(TaskAssignment.objects.filter(
+            task_id__in=[task.pk for task in changed_tasks] + deletes
+        ).values_list("task_id", "user_id"))
+
+        # Bulk writes send no task signals, so do their bookkeeping here:
+        # drop everyone's cached lists, tombstone the boards each removed
+        # or deleted task has left, and push the changes to clients.
+        invalidate_task_lists(
+            user_id for _, user_id in old_pairs | new_pairs)
+        dropped = set(deletes) | reassigned
+        removed = [
+            pair for pair in old_pairs - new_pairs if pair[0] in dropped]
+        TaskTombstone.record(removed)
+        publish_task_removals(removed)
+        publish_task_changes(
+            [task.pk for task in new_tasks + changed_tasks],
+            added=new_pairs - old_pairs,
+        )
+
+        TaskAssignment.objects.filter(task_id__in=reassigned).delete()
+        TaskAssignment.objects.bulk_create(
+            [TaskAssignment(task_id=task_id, user_id=user_id)
+             for task_id, user_id in new_pairs],
+            batch_size=1000,
+        )
+
+        if deletes:
+            with suspend_task_signals():
+                Task.objects.filter(pk__in=deletes).delete()
+
+        return {
+            "created": [task.pk for task in new_tasks],
+            "updated": [task.pk for task in changed_tasks],
+            "deleted": deletes,
+        }
+
+
+class TaskSyncQuerySerializer(serializers.Serializer):
+    """Query parameters of GET /api/tasks/sync/."""
+    since = serializers.DateTimeField(required=False)
+    # Start of the sync being paged; set on the "next" link.
+    as_of = serializers.DateTimeField(required=False)
+
+
+# ──────────────────────────────
+#  List & Detail
+# ──────────────────────────────
+class TaskReadSerializer(SparseFieldsMixin, serializers.BaseSerializer):
+    """
+    Read-only counterpart of TaskSerializer for list, retrieve and sync.
+
+    Produces exactly TaskSerializer's JSON, ``?fields=`` and ``?expand=``
+    included, but builds each task's dict straight from the instance: no
+    per-row field binding, related-field querysets or nested
+    FileSerializer. Expects the relations to be loaded by
+    ``TaskQuerySet.with_related()``.
+    """
+    FIELDS = (
+        "id", "title", "description", "due_date", "priority", "category",
+        "status", "assigned_users", "upload_files", "created_at",
+        "updated_at", "is_overdue", "search",
     )
-    category = serializers.StringRelatedField()
-    upload_files = FileSerializer(many=True)
 
-    class Meta:
-        model = Task
-        fields = [
-            "id", "title", "description", "due_date", "priority",
-            "category", "status", "assigned_users", "assigned_user_ids",
-            "upload_files", "created_at", "updated_at"
-        ]
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Resolved once: ListSerializer reuses one child for every row,
+        # and looking up the active timezone per value is costly.
+        self._today = timezone.now().date()
+        self._date = serializers.DateField()
+        self._datetime = serializers.DateTimeField(
+            default_timezone=timezone.get_current_timezone()
+            if settings.USE_TZ else None)
+
+    @cached_property
+    def _wanted(self):
+        fields, _ = self.fieldset
+        if fields is None:
+            return frozenset(self.FIELDS)
+        return fields
+
+    def to_representation(self, task):
+        want = self._wanted
+        _, expand = self.fieldset
+        to_datetime = self._datetime.to_representation
+        data = {}
+        if "id" in want:
+            data["id"] = task.id
+        if "title" in want:
+            data["title"] = task.title
+        if "description" in want:
+            data["description"] = task.description
+        if "due_date" in want:
+            data["due_date"] = self._date.to_representation(task.due_date)
+        if "priority" in want:
+            data["priority"] = task.priority
+        if "category" in want:
+            if "category" not in expand:
+                data["category"] = task.category_id
+            elif task.category_id is None:
+                data["category"] = None
+            else:
+                data["category"] = {
+                    "id": task.category.id, "name": task.category.name}
+        if "status" in want:
+            data["status"] = task.status
+        if "assigned_users" in want:
+            if "assigned_users" in expand:
+                data["assigned_users"] = [
+                    {"id": user.pk, "username": user.username,
+                     "email": user.email}
+                    for user in task.assigned_users.all()
+                ]
+            else:
+                data["assigned_users"] = [
+                    user.pk for user in task.assigned_users.all()]
+        if "upload_files" in want:
+            data["upload_files"] = [
+                {
+                    "id": f.id,
+                    "file_url": file_url(f),
+                    "status": f.status,
+                    "uploaded_at": to_datetime(f.uploaded_at),
+                }
+                for f in task.upload_files.all()
+            ]
+        if "created_at" in want:
+            data["created_at"] = to_datetime(task.created_at)
+        if "updated_at" in want:
+            data["updated_at"] = to_datetime(task.updated_at)
+        if "is_overdue" in want:
+            data["is_overdue"] = bool(
+                task.due_date and task.status != "done"
+                and self._today > task.due_date)
+        # Annotated by TaskSearchFilter on ?search= results.
+        if "search" in want and hasattr(task, "search_rank"):
+            data["search"] = {
+                "rank": task.search_rank,
+                "title": task.title_highlight,
+                "description": task.description_highlight,
+            }
+        return data
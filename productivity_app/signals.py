@@ -0,0 +1,183 @@
+# productivity_app/signals.py
+"""
+Cache invalidation, updated_at and tombstone bookkeeping, real-time
+task events and failed login counting.
+Connected in ProductivityAppConfig.ready().
+"""
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    invalidate_category_catalogue,
+    invalidate_profile_lists,
+    invalidate_task_lists,
+    invalidate_task_lists_for,
+)
+from . import search
+from .auth.authentication import user_active_cache_key
+from .auth.throttling import LoginRateLimiter
+from .events import publish_task_changes, publish_task_removals
+from .models import (
+    Category, File, Profile, Task, TaskAssignment, TaskTombstone
+)
+
+User = get_user_model()
+
+_state = threading.local()
+
+
+@contextmanager
+def suspend_task_signals():
+    """
+    Skip the per-row task and file handlers below, for bulk operations
+    that do the same bookkeeping once for the whole batch.
+    """
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = False
+
+
+def _suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def _touch_tasks(tasks):
+    """
+    Bump ``tasks`` and drop their assignees' cached lists, for changes
+    that only show in ``?expand=`` (a category or user rename).
+    """
+    invalidate_task_lists_for(tasks.values('pk'))
+    tasks.touch()
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, **kwargs):
+    # Wait for the commit so a concurrent request can't re-cache the
+    # old rows under the new version.
+    transaction.on_commit(invalidate_category_catalogue)
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def category_tasks_changed(sender, instance, created=False, **kwargs):
+    # Before the delete: SET_NULL clears the tasks' category without
+    # sending signals.
+    if not created:
+        _touch_tasks(Task.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    # New tasks have no assignees yet; m2m_changed covers them.
+    if not created:
+        invalidate_task_lists_for([instance.pk])
+        publish_task_changes([instance.pk])
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    if _suspended():
+        return
+    # The assignments are gone by post_delete, so look them up now.
+    user_ids = list(TaskAssignment.objects.filter(
+        task=instance).values_list('user_id', flat=True))
+    invalidate_task_lists(user_ids)
+    pairs = [(instance.pk, user_id) for user_id in user_ids]
+    TaskTombstone.record(pairs)
+    publish_task_removals(pairs)
+
+
+@receiver(m2m_changed, sender=Task.assigned_users.through)
+def task_assignments_changed(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if action in ('post_add', 'post_remove'):
+        if reverse:
+            pairs = [(task_id, instance.pk) for task_id in pk_set]
+        else:
+            pairs = [(instance.pk, user_id) for user_id in pk_set]
+    elif action == 'pre_clear':
+        assignments = TaskAssignment.objects.filter(
+            **{'user' if reverse else 'task': instance})
+        pairs = list(assignments.values_list('task_id', 'user_id'))
+    else:
+        return
+    task_ids = {task_id for task_id, _ in pairs}
+    # Every assignee's list shows the assigned users, not only the
+    # added or removed ones'.
+    invalidate_task_lists(user_id for _, user_id in pairs)
+    invalidate_task_lists_for(task_ids)
+    Task.objects.filter(pk__in=task_ids).touch()
+    if action == 'post_add':
+        publish_task_changes(task_ids, added=pairs)
+    else:
+        # Removed users still need to hear that the task left them.
+        TaskTombstone.record(pairs)
+        publish_task_removals(pairs)
+        publish_task_changes(task_ids)
+
+
+@receiver([post_save, post_delete], sender=File)
+def file_changed(sender, instance, **kwargs):
+    if _suspended():
+        return
+    invalidate_task_lists_for([instance.task_id])
+    Task.objects.filter(pk=instance.task_id).touch()
+    publish_task_changes([instance.task_id])
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def profile_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_profile_lists)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    # Profiles expose the username and email; keep their ETags honest.
+    if update_fields is None or {'username', 'email'} & set(update_fields):
+        Profile.objects.filter(user=instance).update(
+            updated_at=timezone.now())
+        transaction.on_commit(invalidate_profile_lists)
+        if not created:
+            # ... and the ETags of their tasks' ?expand=assigned_users.
+            _touch_tasks(Task.objects.assigned_to(instance))
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_status_changed(sender, instance, update_fields=None, **kwargs):
+    # Cached for StatelessJWTAuthentication; drop it after the commit so
+    # a concurrent request can't re-cache the old status.
+    if update_fields is None or 'is_active' in update_fields:
+        key = user_active_cache_key(instance.pk)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(post_migrate)
+def search_index_migrated(sender, using, **kwargs):
+    if sender.name == 'productivity_app':
+        search.ensure_installed(connections[using])
+
+
+@receiver(user_login_failed)
+def login_failed(sender, credentials, request=None, **kwargs):
+    """
+    Count a failed authenticate() (the token endpoint, the admin) once
+    every backend has refused it, against the IP and the identifier.
+    """
+    identifier = credentials.get('username') or credentials.get('email')
+    if identifier:
+        LoginRateLimiter(request, identifier).failed()
@@ -0,0 +1,125 @@
+# productivity_app/tests/query_budgets.py
+"""
+Query budgets for the API.
+
+Every request made through ``BudgetedAPIClient`` counts its database
+queries and fails the test if it runs more than its endpoint's budget
+in QUERY_BUDGETS, keyed by URL name and HTTP method. Budgets are upper
+bounds for a single request whatever the data volume, so a new N+1
+shows up as a failure in whichever test first hits it with more rows.
+The request's on-commit callbacks are run and counted with it; write
+budgets include the four queries that push the task event.
+
+Run the suite with QUERY_BUDGET_REPORT=1 to print the highest count
+seen per endpoint instead of failing, e.g. to tighten the budgets:
+
+    QUERY_BUDGET_REPORT=1 python manage.py test productivity_app
+"""
+import atexit
+import os
+import sys
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404
+from rest_framework.test import APIClient
+
+from productivity_app.benchmarks import format_table
+
+QUERY_BUDGETS = {
+    ('productivity_app:register', 'POST'): 8,
+    ('productivity_app:login', 'POST'): 2,
+    ('productivity_app:users-list', 'GET'): 2,
+    # A username or email change also touches the user's tasks.
+    ('productivity_app:user-detail', 'PATCH'): 7,
+    ('productivity_app:profile-list', 'GET'): 2,
+    ('productivity_app:profile-detail', 'GET'): 1,
+    ('productivity_app:profile-detail', 'PATCH'): 3,
+    ('productivity_app:profile-detail', 'DELETE'): 2,
+    ('productivity_app:category-list', 'GET'): 1,
+    # Uncached, with ?category= and ?assigned_user=: one lookup each to
+    # validate them, the validators, the page and its two prefetches.
+    ('productivity_app:task-list', 'GET'): 6,
+    ('productivity_app:task-list', 'POST'): 17,
+    ('productivity_app:task-detail', 'GET'): 3,
+    ('productivity_app:task-detail', 'PATCH'): 13,
+    ('productivity_app:task-detail', 'DELETE'): 8,
+    ('productivity_app:task-bulk', 'POST'): 19,
+    ('productivity_app:task-sync', 'GET'): 4,
+    ('productivity_app:task-stats', 'GET'): 1,
+    ('productivity_app:task-overdue-count', 'GET'): 1,
+}
+
+REPORT = os.environ.get('QUERY_BUDGET_REPORT') == '1'
+
+# Highest query count seen per (URL name, method).
+observed = {}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def check_budget(view_name, method, queries):
+    """
+    Record ``queries`` (captured SQL) for the endpoint and raise
+    QueryBudgetExceeded if it is over budget, unless reporting.
+    """
+    key = (view_name, method)
+    observed[key] = max(observed.get(key, 0), len(queries))
+    budget = QUERY_BUDGETS.get(key)
+    if REPORT or budget is None or len(queries) <= budget:
+        return
+    sql = '\n'.join(
+        f'{n}. {query["sql"]}' for n, query in enumerate(queries, 1))
+    raise QueryBudgetExceeded(
+        f'{method} {view_name} ran {len(queries)} queries, over its '
+        f'budget of {budget}:\n{sql}')
+
+
+class BudgetedAPIClient(APIClient):
+    """APIClient that holds each request to its endpoint's query budget."""
+
+    def request(self, **request):
+        # Tests run in a transaction that never commits. Run the
+        # request's on-commit callbacks (cache invalidation, event
+        # pushes) as its commit would, and count their queries too.
+        start = len(connection.run_on_commit)
+        with CaptureQueriesContext(connection) as ctx:
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                response = super().request(**request)
+            # Done; an enclosing captureOnCommitCallbacks() must not run
+            # them a second time.
+            del connection.run_on_commit[start:]
+        try:
+            view_name = response.resolver_match.view_name
+        except Resolver404:
+            return response
+        check_budget(
+            view_name, request['REQUEST_METHOD'], ctx.captured_queries)
+        return response
+
+
+def report():
+    rows = []
+    for (view_name, method), count in sorted(observed.items()):
+        budget = QUERY_BUDGETS.get((view_name, method))
+        rows.append({
+            'endpoint': view_name,
+            'method': method,
+            'queries': count,
+            'budget': '-' if budget is None else budget,
+            'note': (
+                'no budget' if budget is None
+                else 'over budget' if count > budget
+                else f'{budget - count} to spare' if count < budget
+                else ''
+            ),
+        })
+    sys.stderr.write('\nQuery budgets\n' + format_table(
+        rows, ['endpoint', 'method', 'queries', 'budget', 'note']) + '\n')
+
+
+if REPORT:
+    atexit.register(report)
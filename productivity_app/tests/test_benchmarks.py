@@ -0,0 +1,65 @@
+# productivity_app/tests/test_benchmarks.py
+from django.test import SimpleTestCase
+
+from productivity_app.benchmarks import (
+    format_table,
+    measure,
+    percentile,
+    regressions,
+    summarize,
+)
+
+
+class BenchmarkHelperTests(SimpleTestCase):
+    def test_percentile_uses_nearest_rank(self):
+        samples = [0.005, 0.001, 0.004, 0.002, 0.003]
+        self.assertEqual(percentile(samples, 50), 0.003)
+        self.assertEqual(percentile(samples, 99), 0.005)
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_summarize_reports_milliseconds(self):
+        stats = summarize([0.001] * 99 + [0.1])
+        self.assertEqual(stats["iterations"], 100)
+        self.assertEqual(stats["p50_ms"], 1.0)
+        self.assertEqual(stats["p99_ms"], 1.0)
+        self.assertEqual(stats["max_ms"], 100.0)
+
+    def test_measure_runs_warmup_separately(self):
+        calls = []
+        samples = measure(lambda: calls.append(1), iterations=3, warmup=2)
+        self.assertEqual(len(samples), 3)
+        self.assertEqual(len(calls), 5)
+
+    def test_measure_does_not_time_setup(self):
+        calls = []
+        samples = measure(
+            lambda: calls.append("call"), iterations=2, warmup=1,
+            setup=lambda: calls.append("setup"))
+        self.assertEqual(len(samples), 2)
+        self.assertEqual(calls, ["setup", "call"] * 3)
+
+    def test_regressions(self):
+        baseline = [
+            {"endpoint": "a", "p99_ms": 10.0, "queries": 3},
+            {"endpoint": "b", "p99_ms": 10.0, "queries": 3},
+            {"endpoint": "c", "p99_ms": 10.0, "queries": 3},
+        ]
+        results = [
+            {"endpoint": "a", "p99_ms": 12.0, "queries": 3},
+            {"endpoint": "b", "p99_ms": 13.0, "queries": 3},
+            {"endpoint": "c", "p99_ms": 5.0, "queries": 4},
+            {"endpoint": "new", "p99_ms": 99.0, "queries": 9},
+        ]
+        found = regressions(baseline, results, "endpoint", tolerance=0.25)
+        self.assertEqual(
+            [(row["endpoint"], reasons) for row, _, reasons in found],
+            [("b", ["p99 10.0 -> 13.0 ms"]), ("c", ["queries 3 -> 4"])],
+        )
+
+    def test_format_table(self):
+        table = format_table(
+            [{"mode": "pool", "p99_ms": 1.5}], ["mode", "p99_ms"])
+        self.assertEqual(
+            table.splitlines(),
+            ["mode  p99_ms", "----  ------", "pool  1.5"],
+        )
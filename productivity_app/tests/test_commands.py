@@ -0,0 +1,89 @@
+# productivity_app/tests/test_commands.py
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from productivity_app.models import Task, TaskTombstone
+
+User = get_user_model()
+
+
+class PruneTaskTombstonesTests(TestCase):
+    def test_old_tombstones_are_deleted(self):
+        user = User.objects.create_user(username="pruner", password="pw")
+        old, recent = TaskTombstone.record([(1, user.pk), (2, user.pk)])
+        TaskTombstone.objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=45))
+
+        out = StringIO()
+        call_command("prune_task_tombstones", "--days", "30", stdout=out)
+
+        self.assertEqual(
+            list(TaskTombstone.objects.values_list("pk", flat=True)),
+            [recent.pk])
+        self.assertIn("Deleted 1", out.getvalue())
+
+
+# Keeps the login and register requests fast.
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class BenchmarkApiTests(TestCase):
+    def benchmark(self, *args):
+        call_command(
+            "benchmark_api", "--in-place", "--users", "3", "--tasks", "20",
+            "--iterations", "2", "--auth-iterations", "1", "--warmup", "1",
+            *args, stdout=StringIO(), stderr=StringIO())
+
+    def test_results_are_written_as_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "api.json")
+            self.benchmark("--json", path)
+            with open(path) as fh:
+                report = json.load(fh)
+
+        self.assertEqual(report["config"]["tasks"], 20)
+        results = {row["endpoint"]: row for row in report["results"]}
+        self.assertIn("login", results)
+        self.assertIn("tasks-list", results)
+        self.assertEqual(results["login"]["iterations"], 1)
+        self.assertEqual(results["tasks-list"]["iterations"], 2)
+        self.assertEqual(results["categories"]["queries"], 0)
+        self.assertEqual(Task.objects.count(), 20 + 3)
+
+    def test_regressions_against_a_baseline_fail(self):
+        baseline = {"results": [
+            {"endpoint": "users-list", "p99_ms": 0.001, "queries": 0},
+        ]}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with open(path, "w") as fh:
+                json.dump(baseline, fh)
+            with self.assertRaisesMessage(CommandError, "1 endpoint(s)"):
+                self.benchmark("--endpoint", "users-list", "--baseline", path)
+
+    def test_unknown_endpoint(self):
+        with self.assertRaisesMessage(CommandError, "nope"):
+            self.benchmark("--endpoint", "nope")
+
+
+class BenchmarkTaskSerializersTests(TestCase):
+    def test_both_serializers_are_timed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "serializers.json")
+            call_command(
+                "benchmark_task_serializers", "--in-place", "--users", "2",
+                "--tasks", "10", "--iterations", "1", "--warmup", "0",
+                "--json", path, stdout=StringIO())
+            with open(path) as fh:
+                report = json.load(fh)
+
+        self.assertEqual(
+            [row["serializer"] for row in report["results"]],
+            ["model", "read"])
+        self.assertEqual(report["results"][0]["rows"], 10)
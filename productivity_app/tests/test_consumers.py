@@ -0,0 +1,158 @@
+# productivity_app/tests/test_consumers.py
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from productivity_app.auth.websocket import JWTAuthMiddleware
+from productivity_app.events import (
+    publish_task_changes,
+    publish_task_removals,
+)
+from productivity_app.models import Category, Task
+from productivity_app.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+class TaskConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="listener", email="ws@example.com", password="pass123"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", email="other@example.com", password="pass123"
+        )
+        self.category, _ = Category.objects.get_or_create(name="Development")
+
+    async def connect(self, user=None):
+        query = f"token={AccessToken.for_user(user)}" if user else ""
+        communicator = ApplicationCommunicator(application, {
+            "type": "websocket",
+            "path": "/ws/tasks/",
+            "query_string": query.encode(),
+            "headers": [],
+        })
+        await communicator.send_input({"type": "websocket.connect"})
+        message = await communicator.receive_output(timeout=5)
+        return communicator, message
+
+    async def receive_event(self, communicator):
+        message = await communicator.receive_output(timeout=5)
+        self.assertEqual(message["type"], "websocket.send")
+        return json.loads(message["text"])
+
+    async def disconnect(self, communicator):
+        await communicator.send_input(
+            {"type": "websocket.disconnect", "code": 1000})
+        await communicator.wait(timeout=5)
+
+    async def test_anonymous_connection_is_rejected(self):
+        communicator, message = await self.connect()
+        self.assertEqual(message["type"], "websocket.close")
+
+    async def test_invalid_token_is_rejected(self):
+        communicator = ApplicationCommunicator(application, {
+            "type": "websocket",
+            "path": "/ws/tasks/",
+            "query_string": b"token=not-a-jwt",
+            "headers": [],
+        })
+        await communicator.send_input({"type": "websocket.connect"})
+        message = await communicator.receive_output(timeout=5)
+        self.assertEqual(message["type"], "websocket.close")
+
+    async def test_assignees_receive_task_events(self):
+        communicator, message = await self.connect(self.user)
+        self.assertEqual(message["type"], "websocket.accept")
+
+        @sync_to_async
+        def create_task():
+            task = Task.objects.create(
+                title="Live", description="Pushed",
+                category=self.category, created_by=self.user,
+            )
+            task.assigned_users.set([self.user])
+            return task
+
+        task = await create_task()
+        event = await self.receive_event(communicator)
+        self.assertEqual(event["event"], "task.created")
+        self.assertEqual(event["task"]["id"], task.id)
+        self.assertEqual(event["task"]["title"], "Live")
+
+        task.title = "Renamed"
+        await sync_to_async(task.save)()
+        event = await self.receive_event(communicator)
+        self.assertEqual(event["event"], "task.updated")
+        self.assertEqual(event["task"]["title"], "Renamed")
+
+        task_id = task.id
+        await sync_to_async(task.delete)()
+        event = await self.receive_event(communicator)
+        self.assertEqual(event, {"event": "task.deleted", "id": task_id})
+
+        await self.disconnect(communicator)
+
+    async def test_other_users_tasks_are_not_pushed(self):
+        communicator, _ = await self.connect(self.user)
+
+        @sync_to_async
+        def create_task():
+            task = Task.objects.create(
+                title="Private", description="Not yours",
+                category=self.category, created_by=self.other_user,
+            )
+            task.assigned_users.set([self.other_user])
+
+        await create_task()
+        self.assertTrue(await communicator.receive_nothing(timeout=0.2))
+        await self.disconnect(communicator)
+
+    async def test_bulk_changes_are_batched_per_user(self):
+        communicator, _ = await self.connect(self.user)
+
+        @sync_to_async
+        def create_tasks():
+            tasks = Task.objects.bulk_create([
+                Task(title=f"Bulk {i}", description="Batched",
+                     category=self.category, created_by=self.user)
+                for i in range(3)
+            ])
+            for task in tasks:
+                task.assigned_users.set([self.user, self.other_user])
+            return [task.id for task in tasks]
+
+        task_ids = await create_tasks()
+        # Drain the per-task events sent by the assignment signals.
+        for _ in task_ids:
+            await self.receive_event(communicator)
+
+        layer = get_channel_layer()
+        with mock.patch.object(
+                layer, "group_send", wraps=layer.group_send) as group_send:
+            await sync_to_async(publish_task_changes)(task_ids)
+            await sync_to_async(publish_task_removals)(
+                [(task_id, self.user.id) for task_id in task_ids])
+        # One message per user for the changes and one for the
+        # removals, not one per (task, user).
+        self.assertEqual(group_send.call_count, 3)
+
+        events = [await self.receive_event(communicator) for _ in range(6)]
+        self.assertEqual(
+            [event["task"]["id"] for event in events[:3]], sorted(task_ids))
+        self.assertEqual(
+            {event["event"] for event in events[:3]}, {"task.updated"})
+        self.assertEqual(events[3:], [
+            {"event": "task.deleted", "id": task_id}
+            for task_id in task_ids
+        ])
+        await self.disconnect(communicator)
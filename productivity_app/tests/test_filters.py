@@ -0,0 +1,111 @@
+# productivity_app/tests/test_filters.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from productivity_app.models import Category, Task
+from productivity_app.tests.query_budgets import BudgetedAPIClient
+
+User = get_user_model()
+
+
+class TaskFilterSetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = BudgetedAPIClient()
+        self.user = User.objects.create_user(
+            username="filterer", email="filter@example.com", password="pw"
+        )
+        self.teammate = User.objects.create_user(
+            username="teammate", email="team@example.com", password="pw"
+        )
+        self.client.force_authenticate(self.user)
+        self.dev, _ = Category.objects.get_or_create(name="Development")
+        self.design, _ = Category.objects.get_or_create(name="Design")
+        self.url = reverse("productivity_app:task-list")
+
+        today = timezone.now().date()
+        self.tasks = {}
+        for title, days, priority, task_status, category, shared in [
+            ("a", 1, "high", "pending", self.dev, True),
+            ("b", 2, "low", "in_progress", self.dev, False),
+            ("c", 3, "medium", "done", self.design, True),
+            ("d", None, "high", "pending", self.design, False),
+        ]:
+            task = Task.objects.create(
+                title=title, description=title, priority=priority,
+                status=task_status, category=category, created_by=self.user,
+                due_date=today + timedelta(days=days) if days else None,
+            )
+            users = [self.user, self.teammate] if shared else [self.user]
+            task.assigned_users.set(users)
+            self.tasks[title] = task
+
+    def titles(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(t["title"] for t in response.data["results"])
+
+    def test_multi_value_filters(self):
+        self.assertEqual(
+            self.titles({"status": ["pending", "done"]}), ["a", "c", "d"])
+        self.assertEqual(self.titles({"priority": ["high"]}), ["a", "d"])
+        self.assertEqual(
+            self.titles({"category": [self.design.id]}), ["c", "d"])
+        self.assertEqual(
+            self.titles({"assigned_user": [self.teammate.id]}), ["a", "c"])
+
+    def test_filters_combine(self):
+        self.assertEqual(
+            self.titles({"priority": ["high"], "category": [self.dev.id]}),
+            ["a"],
+        )
+
+    def test_filters_are_validated_once(self):
+        # One lookup each for ?category= and ?assigned_user=, then the
+        # validators, the page and its two prefetches.
+        with self.assertNumQueries(6):
+            titles = self.titles({
+                "category": [self.dev.id],
+                "assigned_user": [self.teammate.id],
+            })
+        self.assertEqual(titles, ["a"])
+
+    def test_range_filters(self):
+        today = timezone.now().date()
+        self.assertEqual(
+            self.titles({
+                "due_date_after": str(today + timedelta(days=2)),
+                "due_date_before": str(today + timedelta(days=3)),
+            }),
+            ["b", "c"],
+        )
+        Task.objects.filter(pk=self.tasks["a"].pk).update(
+            created_at=timezone.now() - timedelta(days=30))
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        self.assertEqual(
+            self.titles({"created_at_after": since}), ["b", "c", "d"])
+
+    def test_invalid_values_are_rejected(self):
+        for params in [{"status": "archived"}, {"category": 9999},
+                       {"due_date_after": "soon"}]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ordering_whitelist(self):
+        response = self.client.get(self.url, {"ordering": "-priority"})
+        priorities = [t["priority"] for t in response.data["results"]]
+        self.assertEqual(priorities[:2], ["high", "high"])
+        self.assertEqual(priorities[-1], "low")
+
+        # Unindexed fields are ignored; the default ordering applies.
+        default = self.client.get(self.url).data["results"]
+        response = self.client.get(self.url, {"ordering": "description"})
+        self.assertEqual(response.data["results"], default)
@@ -4,6 +4,8 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 
+from productivity_app.tests.query_budgets import BudgetedAPIClient
+
 User = get_user_model()
 
 
@@ -11,6 +13,7 @@ class UserRegistrationIntegrationTest(APITestCase):
     """
     End-to-end integration test for user registration.
     """
+    client_class = BudgetedAPIClient
 
     def test_user_registration_success(self):
         url = reverse("productivity_app:register")
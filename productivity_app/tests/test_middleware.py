@@ -0,0 +1,89 @@
+# productivity_app/tests/test_middleware.py
+import json
+import os
+import pstats
+import re
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from productivity_app.models import Category, Task
+from productivity_app.tests.query_budgets import BudgetedAPIClient
+
+User = get_user_model()
+
+
+def timings(response):
+    """Server-Timing as {name: {'dur': ..., 'desc': ...}}."""
+    metrics = {}
+    for entry in response["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(
+            param.split("=", 1) for param in params)
+    return metrics
+
+
+class RequestProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = BudgetedAPIClient()
+        self.user = User.objects.create_user(
+            username="profiled", email="p@example.com", password="pass123"
+        )
+        self.client.force_authenticate(self.user)
+        category, _ = Category.objects.get_or_create(name="Development")
+        for i in range(3):
+            task = Task.objects.create(
+                title=f"Task {i}", description="Profiled",
+                category=category, created_by=self.user)
+            task.assigned_users.set([self.user])
+        self.url = reverse("productivity_app:task-list")
+
+    def test_server_timing_reports_queries_and_serializer_time(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        metrics = timings(response)
+        self.assertEqual(
+            metrics["db"]["desc"], f'"{len(ctx.captured_queries)} queries"')
+        self.assertGreater(float(metrics["serialize"]["dur"]), 0)
+        self.assertGreaterEqual(
+            float(metrics["total"]["dur"]), float(metrics["db"]["dur"]))
+
+    def test_cache_hits_are_counted(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        hits, misses = map(int, re.findall(
+            r"\d+", timings(response)["cache"]["desc"]))
+        self.assertGreater(hits, 0)
+        self.assertEqual(timings(response)["db"]["desc"], '"0 queries"')
+
+    def test_each_request_is_logged_as_json(self):
+        with self.assertLogs("drf_api.requests", "INFO") as logs:
+            self.client.get(self.url)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "productivity_app:task-list")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["db_queries"], 0)
+
+    def test_slow_sampled_requests_are_dumped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                REQUEST_PROFILE_SAMPLE_RATE=1, REQUEST_PROFILE_SLOW_MS=0,
+                REQUEST_PROFILE_DIR=directory,
+            ), self.assertLogs("drf_api.requests", "WARNING") as logs:
+                self.client.get(self.url)
+            record = json.loads(logs.records[0].getMessage())
+            self.assertEqual(
+                os.path.dirname(record["profile"]), directory)
+            stats = pstats.Stats(record["profile"])
+            self.assertGreater(stats.total_calls, 0)
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_can_be_disabled(self):
+        response = self.client.get(self.url)
+        self.assertNotIn("Server-Timing", response)
@@ -3,7 +3,7 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import timedelta
 from django.contrib.auth import get_user_model
-from productivity_app.models import Task, Category
+from productivity_app.models import Task, Category, TaskAssignment
 
 User = get_user_model()
 
@@ -118,3 +118,106 @@ class TaskModelTests(TestCase):
             created_by=self.user,
         )
         self.assertFalse(no_due_task.is_overdue)
+
+
+class TaskAssignmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='member1', password='pass123')
+        cls.other = User.objects.create_user(
+            username='member2', password='pass123')
+        cls.category, _ = Category.objects.get_or_create(name='Development')
+
+    def test_set_keeps_assignment_rows_in_sync(self):
+        task = Task.objects.create(
+            title="Shared", description="Shared task", category=self.category)
+        task.assigned_users.set([self.user, self.other])
+        self.assertCountEqual(
+            TaskAssignment.objects.filter(task=task)
+            .values_list('user_id', flat=True),
+            [self.user.id, self.other.id],
+        )
+
+        task.assigned_users.set([self.other])
+        self.assertEqual(
+            list(TaskAssignment.objects.filter(task=task)
+                 .values_list('user_id', flat=True)),
+            [self.other.id],
+        )
+
+    def test_assigned_to_returns_each_task_once(self):
+        task = Task.objects.create(
+            title="Shared", description="Shared task", category=self.category)
+        task.assigned_users.set([self.user, self.other])
+        Task.objects.create(
+            title="Unassigned", description="Nobody", category=self.category)
+
+        self.assertEqual(list(Task.objects.assigned_to(self.user)), [task])
+
+
+class TaskOverdueQuerySetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category, _ = Category.objects.get_or_create(name='Development')
+        today = timezone.now().date()
+        cls.tasks = {}
+        for name, days, status in [
+            ('late', -2, 'pending'),
+            ('late_done', -2, 'done'),
+            ('upcoming', 3, 'in_progress'),
+            ('undated', None, 'pending'),
+        ]:
+            task = Task.objects.create(
+                title=name, description=name, status=status,
+                category=cls.category,
+            )
+            if days is not None:
+                # Past due dates fail validation on save().
+                Task.objects.filter(pk=task.pk).update(
+                    due_date=today + timedelta(days=days))
+            cls.tasks[name] = task
+
+    def test_overdue_matches_is_overdue(self):
+        expected = {t.title for t in Task.objects.all() if t.is_overdue}
+        self.assertEqual(expected, {'late'})
+        self.assertEqual(
+            set(Task.objects.overdue().values_list('title', flat=True)),
+            expected,
+        )
+        self.assertEqual(
+            set(Task.objects.overdue(False).values_list('title', flat=True)),
+            {'late_done', 'upcoming', 'undated'},
+        )
+
+    def test_overdue_query_uses_partial_index(self):
+        plan = Task.objects.overdue().order_by().explain()
+        self.assertIn('task_overdue_idx', plan)
+
+
+class TaskPriorityRankTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category, _ = Category.objects.get_or_create(name='Development')
+
+    def make_task(self, priority):
+        return Task.objects.create(
+            title=priority, description=priority, priority=priority,
+            category=self.category,
+        )
+
+    def test_rank_follows_priority(self):
+        task = self.make_task('low')
+        self.assertEqual(task.priority_rank, 1)
+        task.priority = 'high'
+        task.save(update_fields=['priority'])
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, 3)
+
+    def test_default_ordering_sorts_by_rank(self):
+        for priority in ('medium', 'high', 'low'):
+            self.make_task(priority)
+        self.assertEqual(
+            list(Task.objects.values_list('priority', flat=True)),
+            ['high', 'medium', 'low'],
+        )
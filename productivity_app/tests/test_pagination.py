@@ -0,0 +1,158 @@
+# productivity_app/tests/test_pagination.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from productivity_app.models import Category, Profile, Task
+from productivity_app.tests.query_budgets import BudgetedAPIClient
+from productivity_app.views import TaskViewSet
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = BudgetedAPIClient()
+        self.user = User.objects.create_user(
+            username="pager", email="pager@example.com", password="pass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.category, _ = Category.objects.get_or_create(name="Development")
+
+        today = timezone.now().date()
+        # Duplicate and missing due dates exercise the id tie-breaker
+        # and NULL handling.
+        due_dates = [
+            today + timedelta(days=3),
+            None,
+            today + timedelta(days=1),
+            today + timedelta(days=1),
+            None,
+            today + timedelta(days=2),
+            today + timedelta(days=1),
+        ]
+        for i, due_date in enumerate(due_dates):
+            task = Task.objects.create(
+                title=f"Task {i}",
+                description="Paged",
+                due_date=due_date,
+                category=self.category,
+                created_by=self.user,
+            )
+            task.assigned_users.set([self.user])
+
+        # Soonest first, NULL due dates last, ties broken by id.
+        tasks = Task.objects.all()
+        self.expected = [
+            t.id for t in sorted(
+                tasks, key=lambda t: (t.due_date is None, t.due_date, t.id)
+            )
+        ]
+
+    def walk(self, url, direction="next"):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            page = [t["id"] for t in response.data["results"]]
+            ids = page + ids if direction == "previous" else ids + page
+            pages += 1
+            last = response
+            url = response.data[direction]
+        return ids, pages, last
+
+    def test_task_pages_follow_due_date_then_id(self):
+        url = reverse("productivity_app:task-list") + "?page_size=2"
+        ids, pages, last = self.walk(url)
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 4)
+        self.assertIsNone(last.data["next"])
+
+    def test_previous_links_walk_back_to_the_start(self):
+        url = reverse("productivity_app:task-list") + "?page_size=3"
+        _, _, last = self.walk(url)
+        previous = last.data["previous"]
+        ids, _, first = self.walk(previous, direction="previous")
+        # The walk back covers every page before the last one.
+        self.assertEqual(ids, self.expected[:6])
+        self.assertIsNone(first.data["previous"])
+
+    def test_same_day_tasks_are_paged_by_priority(self):
+        due_date = timezone.now().date() + timedelta(days=10)
+        ranked = {}
+        for priority in ("low", "high", "medium"):
+            task = Task.objects.create(
+                title=priority, description="Ranked", priority=priority,
+                due_date=due_date, category=self.category,
+                created_by=self.user,
+            )
+            task.assigned_users.set([self.user])
+            ranked[task.id] = priority
+        url = reverse("productivity_app:task-list") + "?page_size=2"
+        ids, _, _ = self.walk(url)
+        self.assertEqual(
+            [ranked[pk] for pk in ids if pk in ranked],
+            ["high", "medium", "low"],
+        )
+
+    def test_every_ordering_pages_through(self):
+        design, _ = Category.objects.get_or_create(name="Design")
+        Task.objects.filter(title__in=["Task 1", "Task 4"]).update(
+            category=design, priority="high", priority_rank=3)
+        url = reverse("productivity_app:task-list")
+        for field in TaskViewSet.ordering_fields:
+            for ordering in (field, "-" + field):
+                for fields in ("", "&fields=id"):
+                    with self.subTest(ordering=ordering, fields=fields):
+                        ids, pages, _ = self.walk(
+                            f"{url}?ordering={ordering}&page_size=2{fields}")
+                        self.assertCountEqual(ids, self.expected)
+                        self.assertEqual(pages, 4)
+
+    def test_ordering_by_priority_uses_rank(self):
+        Task.objects.filter(title="Task 0").update(
+            priority="high", priority_rank=3)
+        Task.objects.filter(title="Task 1").update(
+            priority="low", priority_rank=1)
+        url = reverse("productivity_app:task-list")
+        response = self.client.get(url, {"ordering": "-priority"})
+        priorities = [t["priority"] for t in response.data["results"]]
+        self.assertEqual(priorities[0], "high")
+        self.assertEqual(priorities[-1], "low")
+
+    def test_invalid_cursor_returns_404(self):
+        url = reverse("productivity_app:task-list") + "?cursor=bogus"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_users_are_paged_by_id(self):
+        for i in range(4):
+            User.objects.create_user(username=f"user{i}", password="pass123")
+        url = reverse("productivity_app:users-list") + "?page_size=2"
+        ids, pages, _ = self.walk(url)
+        self.assertEqual(
+            ids, list(User.objects.order_by("id").values_list("id", flat=True))
+        )
+        self.assertEqual(pages, 3)
+
+    def test_profiles_page_by_related_ordering(self):
+        for name in ["delta", "alpha", "charlie", "bravo"]:
+            User.objects.create_user(
+                username=name, email=f"{name}@example.com",
+                password="pass123")
+        base = reverse("productivity_app:profile-list") + "?page_size=2"
+        for ordering in ["user__username", "-user__email"]:
+            expected = list(Profile.objects.order_by(
+                ordering, "id").values_list("id", flat=True))
+            for extra in ["", "&fields=id"]:
+                with self.subTest(ordering=ordering, extra=extra):
+                    ids, pages, _ = self.walk(
+                        f"{base}&ordering={ordering}{extra}")
+                    self.assertEqual(ids, expected)
+                    self.assertEqual(pages, 3)
@@ -6,6 +6,7 @@ from productivity_app.permissions import (
     IsAssignedOrReadOnly,
     IsSelfOrReadOnly,
     IsOwnerOrReadOnly,
+    is_assigned,
 )
 from rest_framework.test import APIRequestFactory
 from rest_framework.views import APIView
@@ -71,6 +72,16 @@ class PermissionTests(TestCase):
             permission.has_object_permission(request, DummyView(), self.task)
         )
 
+    def test_is_assigned_check_is_memoized_per_request(self):
+        permission = IsAssignedOrReadOnly()
+        request = self.factory.delete("/tasks/")
+        request.user = self.user1
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                self.assertTrue(permission.has_object_permission(
+                    request, DummyView(), self.task))
+                self.assertTrue(is_assigned(request, self.task))
+
     # --- IsSelfOrReadOnly tests ---
     def test_is_self_or_readonly(self):
         permission = IsSelfOrReadOnly()
@@ -0,0 +1,42 @@
+# productivity_app/tests/test_query_budgets.py
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from productivity_app.tests import query_budgets
+from productivity_app.tests.query_budgets import (
+    BudgetedAPIClient,
+    QueryBudgetExceeded,
+)
+
+CATEGORIES = ("productivity_app:category-list", "GET")
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = BudgetedAPIClient()
+        self.url = reverse("productivity_app:category-list")
+
+    def test_requests_over_budget_fail(self):
+        with patch.dict(query_budgets.QUERY_BUDGETS, {CATEGORIES: 0}), \
+                patch.object(query_budgets, "REPORT", False):
+            message = "GET productivity_app:category-list ran 1 queries"
+            with self.assertRaisesMessage(QueryBudgetExceeded, message):
+                self.client.get(self.url)
+
+    def test_requests_within_budget_pass(self):
+        with patch.dict(query_budgets.QUERY_BUDGETS, {CATEGORIES: 1}):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_report_mode_records_instead_of_failing(self):
+        with patch.dict(query_budgets.QUERY_BUDGETS, {CATEGORIES: 0}), \
+                patch.dict(query_budgets.observed, clear=True), \
+                patch.object(query_budgets, "REPORT", True):
+            self.client.get(self.url)
+            self.assertEqual(query_budgets.observed, {CATEGORIES: 1})
+
+    def test_unresolved_paths_are_ignored(self):
+        self.assertEqual(self.client.get("/no/such/path/").status_code, 404)
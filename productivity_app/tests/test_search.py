@@ -0,0 +1,130 @@
+# productivity_app/tests/test_search.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from productivity_app import search
+from productivity_app.models import Category, Task
+from productivity_app.tests.query_budgets import BudgetedAPIClient
+
+User = get_user_model()
+
+
+class TaskSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = BudgetedAPIClient()
+        self.user = User.objects.create_user(
+            username="seeker", email="seek@example.com", password="pass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.url = reverse("productivity_app:task-list")
+
+        self.in_title = self.make_task(
+            "Invoice reminders", "Email customers about late payments")
+        self.in_description = self.make_task(
+            "Billing cleanup", "Archive every paid invoice from 2023")
+        self.unrelated = self.make_task(
+            "Team offsite", "Book the venue and catering")
+
+    def make_task(self, title, description, user=None):
+        task = Task.objects.create(
+            title=title, description=description,
+            category=self.category, created_by=user or self.user,
+        )
+        task.assigned_users.set([user or self.user])
+        return task
+
+    def search(self, text, **params):
+        response = self.client.get(self.url, {"search": text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_results_are_ranked_and_highlighted(self):
+        results = self.search("invoice")["results"]
+        self.assertEqual(
+            [t["id"] for t in results],
+            [self.in_title.id, self.in_description.id],
+        )
+        self.assertGreater(
+            results[0]["search"]["rank"], results[1]["search"]["rank"])
+        self.assertEqual(
+            results[0]["search"]["title"], "<mark>Invoice</mark> reminders")
+        self.assertIn(
+            "<mark>invoice</mark>", results[1]["search"]["description"])
+
+    def test_highlights_are_html_escaped(self):
+        task = self.make_task(
+            "<script>alert(1)</script> invoice",
+            "Pay <img src=x onerror=alert(1)> the invoice & file it")
+        result = next(
+            t for t in self.search("invoice")["results"] if t["id"] == task.id)
+        self.assertEqual(
+            result["search"]["title"],
+            "&lt;script&gt;alert(1)&lt;/script&gt; <mark>invoice</mark>")
+        self.assertEqual(
+            result["search"]["description"],
+            "Pay &lt;img src=x onerror=alert(1)&gt; the "
+            "<mark>invoice</mark> &amp; file it")
+        # The task's own fields stay plain text.
+        self.assertEqual(result["title"], task.title)
+
+    def test_words_are_stemmed(self):
+        results = self.search("payment")["results"]
+        self.assertEqual([t["id"] for t in results], [self.in_title.id])
+
+    def test_only_assigned_tasks_are_searched(self):
+        other = User.objects.create_user(username="other", password="pw")
+        self.make_task("Invoice audit", "Someone else's", user=other)
+        results = self.search("invoice")["results"]
+        self.assertEqual(len(results), 2)
+
+    def test_index_follows_writes(self):
+        self.unrelated.title = "Invoice offsite costs"
+        self.unrelated.save()
+        self.in_title.delete()
+        results = self.search("invoice")["results"]
+        self.assertCountEqual(
+            [t["id"] for t in results],
+            [self.in_description.id, self.unrelated.id],
+        )
+
+    def test_search_results_page_in_rank_order(self):
+        expected = [t["id"] for t in self.search("invoice")["results"]]
+        data = self.search("invoice", page_size=1)
+        ids = [t["id"] for t in data["results"]]
+        while data["next"]:
+            data = self.client.get(data["next"]).data
+            ids += [t["id"] for t in data["results"]]
+        self.assertEqual(ids, expected)
+
+    def test_tied_ranks_page_without_gaps(self):
+        tied = [
+            self.make_task("Invoice batch", "Same words, same rank")
+            for _ in range(4)
+        ]
+        expected = [t["id"] for t in self.search("batch")["results"]]
+        self.assertEqual(expected, [t.id for t in tied])
+        data = self.search("batch", page_size=1)
+        ids = [t["id"] for t in data["results"]]
+        while data["next"]:
+            data = self.client.get(data["next"]).data
+            ids += [t["id"] for t in data["results"]]
+        self.assertEqual(ids, expected)
+
+    def test_query_syntax_is_treated_as_text(self):
+        for text in ['"invoice', "invoice OR", "title:invoice*", "***"]:
+            with self.subTest(text=text):
+                self.search(text)
+
+    def test_lost_triggers_are_reinstalled(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {search.FTS_TABLE}_ai")
+        search.ensure_installed(connection)
+        task = self.make_task("Quarterly invoice run", "New after rebuild")
+        results = self.search("quarterly")["results"]
+        self.assertEqual([t["id"] for t in results], [task.id])
@@ -4,14 +4,16 @@ from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIRequestFactory
-from productivity_app.models import Category
-from productivity_app.serializers import TaskSerializer, RegisterSerializer
+from productivity_app.models import Category, File, Task
+from productivity_app.serializers import (
+    TaskReadSerializer, TaskSerializer, RegisterSerializer
+)
 
 User = get_user_model()
 factory = APIRequestFactory()          # needed for request context
 
 
-class TaskSerializerTests[TestCase]:
+class TaskSerializerTests(TestCase):
     @classmethod
     def setUpTestData(cls):
         """Reusable objects – safely avoid duplicate categories."""
@@ -75,6 +77,46 @@ class TaskSerializerTests[TestCase]:
         self.assertIn('past', err_msg)
 
 
+class TaskReadSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', password='pass123')
+        cls.other = User.objects.create_user(
+            username='other', password='pass123')
+        category, _ = Category.objects.get_or_create(name='Development')
+        cls.task = Task.objects.create(
+            title='Read me', description='Details', category=category,
+            created_by=cls.user)
+        cls.task.assigned_users.set([cls.user, cls.other])
+        File.objects.create(task=cls.task, url='https://example.com/a.pdf')
+        File.objects.create(task=cls.task)
+        # Overdue: a past due date only gets in through update().
+        overdue = Task.objects.create(
+            title='Late', description='Details', category=category,
+            created_by=cls.user)
+        Task.objects.filter(pk=overdue.pk).update(
+            due_date=timezone.now().date() - timedelta(days=2))
+
+    def test_matches_task_serializer(self):
+        tasks = list(Task.objects.with_related().order_by('id'))
+        self.assertEqual(
+            TaskReadSerializer(tasks, many=True).data,
+            TaskSerializer(tasks, many=True).data)
+        self.assertTrue(TaskReadSerializer(tasks[1]).data['is_overdue'])
+
+    def test_includes_search_highlights(self):
+        task = Task.objects.with_related().get(pk=self.task.pk)
+        task.search_rank = 0.5
+        task.title_highlight = '<mark>Read</mark> me'
+        task.description_highlight = 'Details'
+        self.assertEqual(TaskReadSerializer(task).data['search'], {
+            'rank': 0.5,
+            'title': '<mark>Read</mark> me',
+            'description': 'Details',
+        })
+
+
 class RegisterSerializerTests(TestCase):
     # ------------------------------------------------------------
     # 3. Valid registration
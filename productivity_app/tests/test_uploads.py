@@ -0,0 +1,100 @@
+# productivity_app/tests/test_uploads.py
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from productivity_app.models import Category, File, Task
+from productivity_app.tests.query_budgets import BudgetedAPIClient
+from productivity_app.uploads import (
+    UploadBackend,
+    process_upload,
+    queue_uploads,
+)
+
+User = get_user_model()
+
+
+class FailingUploadBackend(UploadBackend):
+    def upload(self, content, folder):
+        raise ConnectionError("storage unavailable")
+
+
+@override_settings(
+    FILE_UPLOAD_BACKEND="productivity_app.uploads.LocalUploadBackend",
+    FILE_UPLOAD_ASYNC=False,
+)
+class UploadPipelineTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+        self.user = User.objects.create_user(
+            username="uploader", email="up@example.com", password="pass123"
+        )
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.task = Task.objects.create(
+            title="With files", description="Has attachments",
+            category=self.category, created_by=self.user,
+        )
+        self.task.assigned_users.set([self.user])
+
+    def test_files_stay_pending_until_commit(self):
+        upload = SimpleUploadedFile("notes.txt", b"hello")
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            files = queue_uploads(self.task, [upload])
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(File.objects.get(pk=files[0].pk).status, "pending")
+
+        callbacks[0]()
+        stored = File.objects.get(pk=files[0].pk)
+        self.assertEqual(stored.status, "ready")
+        self.assertTrue(stored.url.startswith("/media/task_files/notes"))
+
+    @override_settings(
+        FILE_UPLOAD_BACKEND=(
+            "productivity_app.tests.test_uploads.FailingUploadBackend"
+        )
+    )
+    def test_failed_upload_is_recorded(self):
+        upload = SimpleUploadedFile("notes.txt", b"hello")
+        with self.assertLogs("productivity_app.uploads", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                files = queue_uploads(self.task, [upload])
+        self.assertEqual(File.objects.get(pk=files[0].pk).status, "failed")
+
+    def test_task_create_queues_every_attachment(self):
+        client = BudgetedAPIClient()
+        client.force_authenticate(self.user)
+        data = {
+            "title": "Task with attachments",
+            "description": "Three files",
+            "category": self.category.id,
+            "files": [
+                SimpleUploadedFile(f"file{i}.txt", b"data") for i in range(3)
+            ],
+        }
+        # The uploads belong to the worker pool, not to the request's
+        # query budget: hold them back and run them afterwards.
+        with mock.patch("productivity_app.uploads._dispatch") as dispatch:
+            response = client.post(
+                reverse("productivity_app:task-list"), data,
+                format="multipart",
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            for call in dispatch.call_args_list:
+                process_upload(*call.args)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task = Task.objects.get(pk=response.data["id"])
+        self.assertEqual(
+            list(task.upload_files.values_list("status", flat=True)),
+            ["ready"] * 3,
+        )
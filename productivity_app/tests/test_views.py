@@ -1,12 +1,23 @@
 # productivity_app/tests/test_views.py
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
 from django.urls import reverse
-from rest_framework.test import APIClient
 from rest_framework import status
 from django.utils import timezone
 from datetime import timedelta
-from django.contrib.auth import get_user_model
-from productivity_app.models import Task, Category
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from productivity_app.auth.authentication import is_user_active
+from productivity_app.cache import CATEGORY_VERSION_KEY, get_version
+from productivity_app.checks import check_shared_cache
+from productivity_app.models import (
+    Task, Category, File, Profile, TaskAssignment, TaskTombstone
+)
+from productivity_app.pagination import TaskSyncPagination
+from productivity_app.tests.query_budgets import BudgetedAPIClient
 
 User = get_user_model()
 
@@ -15,7 +26,9 @@ class BaseAPITestCase(TestCase):
     """Base test case with user and auth client setup."""
 
     def setUp(self):
-        self.client = APIClient()
+        # Cached responses would otherwise leak between tests.
+        cache.clear()
+        self.client = BudgetedAPIClient()
         self.user = User.objects.create_user(
             username="testuser",
             email="test@example.com",
@@ -54,6 +67,129 @@ class AuthenticationTests(BaseAPITestCase):
         self.assertIn("access", response.data)
 
 
+@override_settings(LOGIN_FAILURES_PER_EMAIL=2, LOGIN_FAILURES_PER_IP=3)
+class LoginThrottleTests(BaseAPITestCase):
+    def login(self, email="test@example.com", password="wrong", **extra):
+        url = reverse("productivity_app:login")
+        return self.client.post(
+            url, {"email": email, "password": password},
+            format="json", **extra)
+
+    def test_email_lookup_is_case_insensitive(self):
+        response = self.login("Test@Example.COM", "password123")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_repeated_failures_for_an_email_are_throttled(self):
+        for _ in range(2):
+            self.assertEqual(
+                self.login().status_code, status.HTTP_400_BAD_REQUEST)
+        with patch.object(User, "check_password") as check_password:
+            response = self.login(password="password123")
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        check_password.assert_not_called()
+
+    def test_failures_from_one_ip_are_throttled(self):
+        for n in range(3):
+            self.login(f"nobody{n}@example.com")
+        response = self.login(password="password123")
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.login(
+            password="password123", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_success_clears_the_email_count(self):
+        self.login()
+        self.assertEqual(
+            self.login(password="password123").status_code,
+            status.HTTP_200_OK)
+        self.login()
+        self.assertEqual(
+            self.login(password="password123").status_code,
+            status.HTTP_200_OK)
+
+    def test_hashes_follow_the_configured_iterations(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.assertEqual(
+                self.login(password="password123").status_code,
+                status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def token(self, username="testuser", password="password123"):
+        return self.client.post(
+            reverse("productivity_app:token_obtain_pair"),
+            {"username": username, "password": password}, format="json")
+
+    def test_username_logins_are_not_counted_as_failures(self):
+        # CustomAuthBackend refuses a username; ModelBackend accepts it.
+        for _ in range(5):
+            self.assertEqual(self.token().status_code, status.HTTP_200_OK)
+
+    def test_failed_username_logins_are_throttled(self):
+        for _ in range(2):
+            self.assertEqual(
+                self.token(password="wrong").status_code,
+                status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            self.token().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_startup_check_requires_a_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(SHARED_CACHE=False):
+            warnings = check_shared_cache(None)
+        self.assertEqual(
+            [w.id for w in warnings], ["productivity_app.W001"])
+
+    def test_backend_refuses_throttled_logins(self):
+        for _ in range(2):
+            self.assertIsNone(authenticate(
+                username="test@example.com", password="wrong"))
+        self.assertIsNone(authenticate(
+            username="test@example.com", password="password123"))
+
+
+class StatelessJWTAuthenticationTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        self.url = reverse("productivity_app:task-list")
+
+    def test_requests_skip_the_user_query(self):
+        is_user_active(self.user.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(
+            'FROM "auth_user"' in q["sql"] for q in ctx.captured_queries))
+
+    def test_deactivated_user_is_refused(self):
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(
+            self.client.get(self.url).status_code,
+            status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_refused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(
+            self.client.get(self.url).status_code,
+            status.HTTP_401_UNAUTHORIZED)
+
+    def test_cannot_modify_another_users_profile(self):
+        other = User.objects.create_user(username="other", password="pw")
+        url = reverse(
+            "productivity_app:profile-detail", args=[other.profile.id])
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 # --- User API Tests ---
 class UserAPITests(BaseAPITestCase):
     def test_users_list_requires_auth(self):
@@ -67,7 +203,8 @@ class UserAPITests(BaseAPITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(
-            any(u["username"] == self.user.username for u in response.data)
+            any(u["username"] == self.user.username
+                for u in response.data["results"])
         )
 
     def test_user_detail_update(self):
@@ -87,7 +224,8 @@ class ProfileAPITests(BaseAPITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(
-            any("user_name" in profile for profile in response.data)
+            any("user_name" in profile
+                for profile in response.data["results"])
         )
 
     def test_profile_update_only_self(self):
@@ -107,6 +245,46 @@ class ProfileAPITests(BaseAPITestCase):
         # Username should remain unchanged
         self.assertEqual(profile.user.username, "testuser")
 
+    def test_profile_list_query_count_is_constant(self):
+        url = reverse("productivity_app:profile-list")
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for i in range(10):
+            User.objects.create_user(username=f"member{i}", password="pw")
+        cache.clear()
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 11)
+        self.assertEqual(len(few.captured_queries),
+                         len(many.captured_queries))
+
+    def test_profile_list_is_cached_until_a_user_changes(self):
+        url = reverse("productivity_app:profile-list")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(
+            response.data["results"][0]["user_name"], "testuser")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = "renamed"
+            self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(
+            response.data["results"][0]["user_name"], "renamed")
+
+    def test_profile_modify_other_is_forbidden(self):
+        self.authenticate()
+        other = User.objects.create_user(username="other", password="pw")
+        url = reverse(
+            "productivity_app:profile-detail", args=[other.profile.id])
+        response = self.client.patch(url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(
+            Profile.objects.filter(pk=other.profile.pk).exists())
+
 
 # --- Task API Tests ---
 class TaskAPITests(BaseAPITestCase):
@@ -132,7 +310,8 @@ class TaskAPITests(BaseAPITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(
-            any(t["title"] == self.task.title for t in response.data)
+            any(t["title"] == self.task.title
+                for t in response.data["results"])
         )
 
     def test_task_create(self):
@@ -165,3 +344,777 @@ class TaskAPITests(BaseAPITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Task.objects.filter(id=self.task.id).exists())
+
+    def test_task_write_checks_assignment_once(self):
+        self.client.force_authenticate(self.user)
+        url = reverse("productivity_app:task-detail", args=[self.task.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                url, {"title": "Checked once"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # One EXISTS shared by the permission class and perform_update.
+        assignment_checks = [
+            q for q in queries
+            if q["sql"].startswith('SELECT 1 AS "a" FROM')
+            and "task_assigned_users" in q["sql"]
+        ]
+        self.assertEqual(len(assignment_checks), 1)
+
+
+class TaskOverdueTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.client.force_authenticate(self.user)
+        today = timezone.now().date()
+        self.late = self.make_task("Late", today - timedelta(days=1))
+        self.later = self.make_task("Later", today - timedelta(days=5))
+        self.make_task("Late but done", today - timedelta(days=1), "done")
+        self.make_task("Upcoming", today + timedelta(days=1))
+
+    def make_task(self, title, due_date, status="pending"):
+        task = Task.objects.create(
+            title=title, description="Dashboard", status=status,
+            category=self.category, created_by=self.user,
+        )
+        # Past due dates fail validation on save().
+        Task.objects.filter(pk=task.pk).update(due_date=due_date)
+        task.assigned_users.set([self.user])
+        return task
+
+    def test_overdue_filter(self):
+        response = self.client.get(
+            reverse("productivity_app:task-list"), {"overdue": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [t["id"] for t in results], [self.later.id, self.late.id])
+        self.assertTrue(all(t["is_overdue"] for t in results))
+
+        response = self.client.get(
+            reverse("productivity_app:task-list"), {"overdue": "false"})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertFalse(
+            any(t["is_overdue"] for t in response.data["results"]))
+
+    def test_overdue_count(self):
+        url = reverse("productivity_app:task-overdue-count")
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"count": 2})
+
+        other = User.objects.create_user(username="other", password="pw")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(url).data, {"count": 0})
+
+
+class TaskQueryCountTests(BaseAPITestCase):
+    """The task list must not issue per-row queries."""
+
+    def setUp(self):
+        super().setUp()
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.other_user = User.objects.create_user(
+            username="other", email="other@example.com", password="pass123"
+        )
+
+    def create_tasks(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_tasks(count)
+
+    def _create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                title=f"Task {i}",
+                description="Task description",
+                due_date=timezone.now().date() + timedelta(days=1),
+                category=self.category,
+                created_by=self.user,
+            )
+            task.assigned_users.set([self.user, self.other_user])
+            File.objects.create(task=task)
+
+    def count_list_queries(self):
+        url = reverse("productivity_app:task-list")
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_task_list_query_count_is_constant(self):
+        self.authenticate()
+        # Only the first request looks up the user's active status.
+        is_user_active(self.user.pk)
+        self.create_tasks(2)
+        few_queries, _ = self.count_list_queries()
+
+        self.create_tasks(10)
+        many_queries, response = self.count_list_queries()
+
+        self.assertEqual(len(response.data["results"]), 12)
+        self.assertEqual(few_queries, many_queries)
+        for task in response.data["results"]:
+            self.assertCountEqual(
+                task["assigned_users"], [self.user.id, self.other_user.id]
+            )
+            self.assertEqual(len(task["upload_files"]), 1)
+
+
+class TaskBulkTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.other_user = User.objects.create_user(
+            username="other", email="other@example.com", password="pass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse("productivity_app:task-bulk")
+        self.tomorrow = str(timezone.now().date() + timedelta(days=1))
+
+    def make_task(self, title, users):
+        task = Task.objects.create(
+            title=title, description="Existing", category=self.category,
+            created_by=self.user,
+        )
+        task.assigned_users.set(users)
+        return task
+
+    def test_bulk_create_update_delete(self):
+        to_update = self.make_task("Old title", [self.user])
+        to_delete = self.make_task("Doomed", [self.user])
+        data = {
+            "create": [
+                {
+                    "title": f"Imported {i}",
+                    "description": "From import",
+                    "due_date": self.tomorrow,
+                    "category": self.category.id,
+                    "assigned_users": [self.user.id, self.other_user.id],
+                }
+                for i in range(5)
+            ] + [{
+                "title": "Creator only",
+                "description": "No assignees given",
+                "category": self.category.id,
+            }],
+            "update": [{
+                "id": to_update.id, "title": "New title", "status": "done",
+                "priority": "high",
+                "assigned_users": [self.other_user.id],
+            }],
+            "delete": [to_delete.id],
+        }
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["created"]), 6)
+        self.assertEqual(response.data["updated"], [to_update.id])
+        self.assertEqual(response.data["deleted"], [to_delete.id])
+
+        created = Task.objects.filter(pk__in=response.data["created"])
+        self.assertEqual(created.filter(created_by=self.user).count(), 6)
+        self.assertEqual(
+            TaskAssignment.objects.filter(task__in=created).count(), 11)
+        self.assertEqual(
+            list(Task.objects.get(title="Creator only")
+                 .assigned_users.all()),
+            [self.user],
+        )
+
+        to_update.refresh_from_db()
+        self.assertEqual((to_update.title, to_update.status),
+                         ("New title", "done"))
+        self.assertEqual(to_update.priority_rank, 3)
+        self.assertEqual(list(to_update.assigned_users.all()),
+                         [self.other_user])
+        self.assertFalse(Task.objects.filter(pk=to_delete.pk).exists())
+
+    def test_bulk_reports_errors_per_item_and_writes_nothing(self):
+        foreign = self.make_task("Not mine", [self.other_user])
+        data = {
+            "create": [
+                {"title": "Fine", "description": "ok",
+                 "category": self.category.id},
+                {"title": "Past", "description": "bad",
+                 "category": self.category.id,
+                 "due_date": str(timezone.now().date() - timedelta(days=1))},
+                {"title": "No category", "description": "bad",
+                 "category": 0},
+            ],
+            "delete": [foreign.id],
+        }
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data
+        self.assertEqual(errors["create"][0], {})
+        self.assertIn("non_field_errors", errors["create"][1])
+        self.assertIn("category", errors["create"][2])
+        self.assertEqual(errors["delete"][0], ["Task not found."])
+        self.assertFalse(Task.objects.filter(title="Fine").exists())
+        self.assertTrue(Task.objects.filter(pk=foreign.pk).exists())
+
+    def test_bulk_query_count_does_not_grow_per_task(self):
+        def payload(count):
+            return {"create": [
+                {"title": f"T{i}", "description": "d",
+                 "category": self.category.id,
+                 "assigned_users": [self.user.id]}
+                for i in range(count)
+            ]}
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url, payload(2), format="json")
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.url, payload(40), format="json")
+        self.assertEqual(len(few.captured_queries),
+                         len(many.captured_queries))
+
+
+class CategoryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = BudgetedAPIClient()
+        self.url = reverse("productivity_app:category-list")
+
+    def test_warm_catalogue_skips_the_database(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Development", [c["name"] for c in response.data])
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_category_changes_invalidate_the_catalogue(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Research")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Research", [c["name"] for c in response.data])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(name="Research").delete()
+        response = self.client.get(self.url)
+        self.assertNotIn("Research", [c["name"] for c in response.data])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_catalogue_expires_without_a_shared_cache(self):
+        self.client.get(self.url)
+        # Added by another worker, whose invalidation this one never
+        # sees; the cache entry then expires.
+        Category.objects.bulk_create([Category(name="Research")])
+        cache.delete(
+            f"categories:catalogue:{get_version(CATEGORY_VERSION_KEY)}")
+        response = self.client.get(self.url)
+        self.assertIn("Research", [c["name"] for c in response.data])
+
+
+class TaskListCacheTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("productivity_app:task-list")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = Task.objects.create(
+                title="Cached", description="Cached task",
+                category=self.category, created_by=self.user,
+            )
+            self.task.assigned_users.set([self.user])
+
+    def titles(self):
+        return [t["title"] for t in self.client.get(self.url).data["results"]]
+
+    def test_repeated_list_skips_the_database(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["results"][0]["title"], "Cached")
+
+    @override_settings(SHARED_CACHE=False)
+    def test_not_cached_without_a_shared_cache(self):
+        for name in ("task-list", "task-stats", "profile-list"):
+            url = reverse(f"productivity_app:{name}")
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            self.assertTrue(ctx.captured_queries, name)
+
+    def test_query_parameters_are_cached_separately(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url + "?page_size=1")
+        self.assertTrue(ctx.captured_queries)
+
+    def test_task_update_invalidates(self):
+        self.titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = "Renamed"
+            self.task.save()
+        self.assertEqual(self.titles(), ["Renamed"])
+
+    def test_assignment_changes_invalidate(self):
+        other = User.objects.create_user(username="other", password="pass")
+        self.titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.assigned_users.set([other])
+        self.assertEqual(self.titles(), [])
+
+    def test_file_changes_invalidate(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            File.objects.create(task=self.task)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data["results"][0]["upload_files"]), 1)
+
+    def test_cache_is_per_user(self):
+        self.titles()
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.titles(), [])
+
+
+class ConditionalGetTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(
+            title="Polled", description="Polled task",
+            category=self.category, created_by=self.user,
+        )
+        self.task.assigned_users.set([self.user])
+        self.list_url = reverse("productivity_app:task-list")
+        self.detail_url = reverse(
+            "productivity_app:task-detail", args=[self.task.id])
+
+    def test_task_detail_304_until_changed(self):
+        response = self.client.get(self.detail_url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.task.title = "Changed"
+        self.task.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_task_list_304_until_changed(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        cache.clear()
+        # A cache miss costs only the aggregate query.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        cache.clear()
+        Task.objects.filter(pk=self.task.pk).delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_task_validators_change_at_midnight(self):
+        Task.objects.filter(pk=self.task.pk).update(
+            due_date=timezone.now().date())
+        detail = self.client.get(self.detail_url)
+        listing = self.client.get(self.list_url)
+        self.assertFalse(detail.data["is_overdue"])
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        with patch("django.utils.timezone.now", return_value=tomorrow):
+            response = self.client.get(
+                self.detail_url, HTTP_IF_NONE_MATCH=detail["ETag"],
+                HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data["is_overdue"])
+            response = self.client.get(
+                self.list_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data["results"][0]["is_overdue"])
+
+    def test_new_attachment_changes_task_etag(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        File.objects.create(task=self.task)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_profile_304(self):
+        url = reverse("productivity_app:profile-detail",
+                      args=[self.user.profile.id])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.email = "changed@example.com"
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        list_url = reverse("productivity_app:profile-list")
+        etag = self.client.get(list_url)["ETag"]
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+@override_settings(TASK_SYNC_OVERLAP_SECONDS=0)
+class TaskSyncTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.other_user = User.objects.create_user(
+            username="other", email="other@example.com", password="pass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse("productivity_app:task-sync")
+        self.tasks = [self.make_task(f"Task {i}") for i in range(3)]
+
+    def make_task(self, title):
+        task = Task.objects.create(
+            title=title, description="Synced", category=self.category,
+            created_by=self.user,
+        )
+        task.assigned_users.set([self.user])
+        return task
+
+    def sync(self, since=None):
+        params = {"since": since} if since else {}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_first_sync_returns_everything(self):
+        data = self.sync()
+        self.assertTrue(data["reset"])
+        self.assertIsNone(data["next"])
+        self.assertEqual(
+            sorted(t["id"] for t in data["changed"]),
+            [t.id for t in self.tasks],
+        )
+        self.assertEqual(data["deleted"], [])
+
+    def test_sync_returns_only_changes_since_cursor(self):
+        cursor = self.sync()["cursor"]
+        self.assertEqual(self.sync(cursor)["changed"], [])
+
+        edited, deleted, unassigned = self.tasks
+        deleted_id = deleted.id
+        edited.title = "Edited"
+        edited.save()
+        deleted.delete()
+        unassigned.assigned_users.remove(self.user)
+        added = self.make_task("Added")
+
+        data = self.sync(cursor)
+        self.assertFalse(data["reset"])
+        self.assertEqual(
+            sorted(t["id"] for t in data["changed"]), [edited.id, added.id])
+        self.assertEqual(data["deleted"], [deleted_id, unassigned.id])
+
+    def test_reassigned_task_is_not_reported_deleted(self):
+        cursor = self.sync()["cursor"]
+        task = self.tasks[0]
+        task.assigned_users.remove(self.user)
+        task.assigned_users.add(self.user)
+
+        data = self.sync(cursor)
+        self.assertEqual([t["id"] for t in data["changed"]], [task.id])
+        self.assertEqual(data["deleted"], [])
+
+    def test_bulk_changes_leave_tombstones(self):
+        cursor = self.sync()["cursor"]
+        shared = self.tasks[1]
+        shared.assigned_users.add(self.other_user)
+        response = self.client.post(
+            reverse("productivity_app:task-bulk"),
+            {
+                "update": [{"id": shared.id,
+                            "assigned_users": [self.other_user.id]}],
+                "delete": [self.tasks[0].id],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            self.sync(cursor)["deleted"], [self.tasks[0].id, shared.id])
+        # The other user stays on the shared task: no tombstone.
+        self.assertFalse(
+            TaskTombstone.objects.filter(user=self.other_user).exists())
+
+    @patch.object(TaskSyncPagination, "page_size", 2)
+    def test_snapshot_is_paged(self):
+        first = self.sync()
+        self.assertTrue(first["reset"])
+        self.assertEqual(len(first["changed"]), 2)
+        self.assertIsNotNone(first["next"])
+
+        # Changes made while paging are neither skipped nor lost.
+        edited, deleted = self.tasks[0], self.tasks[1]
+        deleted_id = deleted.id
+        edited.title = "Edited while paging"
+        edited.save()
+        deleted.delete()
+
+        response = self.client.get(first["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rest = response.data
+        self.assertFalse(rest["reset"])
+        self.assertIsNone(rest["next"])
+        self.assertEqual(rest["cursor"], first["cursor"])
+        self.assertEqual(rest["deleted"], [])
+        self.assertEqual(
+            [t["id"] for t in rest["changed"]],
+            [self.tasks[2].id, edited.id])
+
+        self.assertEqual(self.sync(first["cursor"])["deleted"], [deleted_id])
+
+    def test_expired_cursor_resets(self):
+        since = timezone.now() - timedelta(days=365)
+        data = self.sync(since.isoformat())
+        self.assertTrue(data["reset"])
+        self.assertEqual(len(data["changed"]), 3)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_query_count_is_constant(self):
+        cursor = self.sync()["cursor"]
+        for task in self.tasks:
+            task.title = "Touched"
+            task.save()
+        with CaptureQueriesContext(connection) as few:
+            self.sync(cursor)
+        for i in range(5):
+            self.make_task(f"More {i}")
+        with self.assertNumQueries(len(few)):
+            self.sync(cursor)
+
+
+class TaskStatsTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.dev, _ = Category.objects.get_or_create(name="Development")
+        self.design, _ = Category.objects.get_or_create(name="Design")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("productivity_app:task-stats")
+        today = timezone.now().date()
+        for title, task_status, priority, category, due_date in [
+            ("One", "done", "high", self.dev, None),
+            ("Two", "pending", "high", self.dev, today - timedelta(days=2)),
+            ("Three", "in_progress", "low", self.design, None),
+            ("Four", "done", "medium", None, None),
+        ]:
+            task = Task.objects.create(
+                title=title, description="Stats", status=task_status,
+                priority=priority, category=category, created_by=self.user,
+            )
+            Task.objects.filter(pk=task.pk).update(due_date=due_date)
+            task.assigned_users.set([self.user])
+        # Someone else's task must not be counted.
+        other = User.objects.create_user(username="other", password="pw")
+        foreign = Task.objects.create(
+            title="Foreign", description="Stats", category=self.dev)
+        foreign.assigned_users.set([other])
+
+    def test_stats(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data["total"], 4)
+        self.assertEqual(data["done"], 2)
+        self.assertEqual(data["overdue"], 1)
+        self.assertEqual(data["completion_rate"], 0.5)
+        self.assertEqual(
+            data["by_status"], {"pending": 1, "in_progress": 1, "done": 2})
+        self.assertEqual(
+            data["by_priority"], {"low": 1, "medium": 1, "high": 2})
+        self.assertEqual(data["by_category"], [
+            {"id": self.design.id, "name": "Design", "total": 1,
+             "done": 0, "completion_rate": 0.0},
+            {"id": self.dev.id, "name": "Development", "total": 2,
+             "done": 1, "completion_rate": 0.5},
+            {"id": None, "name": None, "total": 1,
+             "done": 1, "completion_rate": 1.0},
+        ])
+
+    def test_stats_honour_filters(self):
+        data = self.client.get(self.url, {"priority": "high"}).data
+        self.assertEqual(data["total"], 2)
+        data = self.client.get(self.url, {"search": "stats"}).data
+        self.assertEqual(data["total"], 4)
+
+    def test_stats_are_cached_until_a_task_changes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        task = Task.objects.get(title="Three")
+        task.status = "done"
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        self.assertEqual(self.client.get(self.url).data["done"], 3)
+
+    def test_stats_require_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SparseFieldsetTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.category, _ = Category.objects.get_or_create(name="Development")
+        self.other_user = User.objects.create_user(
+            username="other", email="other@example.com", password="pass123"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                task = Task.objects.create(
+                    title=f"Task {i}", description="Long description",
+                    category=self.category, created_by=self.user)
+                task.assigned_users.set([self.user, self.other_user])
+                File.objects.create(task=task)
+        self.task = task
+        self.url = reverse("productivity_app:task-list")
+
+    def test_task_list_returns_only_requested_fields(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                self.url, {"fields": "id,title,status"})
+        results = response.data["results"]
+        self.assertEqual(len(results), 3)
+        for task in results:
+            self.assertEqual(list(task), ["id", "title", "status"])
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        # Neither the description column nor the relations are loaded.
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn("productivity_app_file", sql)
+        self.assertNotIn("productivity_app_taskassignment", sql)
+
+    def test_sparse_pages_link_to_the_next_page(self):
+        response = self.client.get(
+            self.url, {"fields": "id", "page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        following = self.client.get(response.data["next"])
+        self.assertEqual(len(following.data["results"]), 1)
+
+    def test_expand_nests_category_and_assigned_users(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {
+                "fields": "id,category,assigned_users",
+                "expand": "category,assigned_users",
+            })
+        task = response.data["results"][0]
+        self.assertEqual(
+            task["category"],
+            {"id": self.category.id, "name": "Development"})
+        self.assertCountEqual(task["assigned_users"], [
+            {"id": self.user.id, "username": "testuser",
+             "email": "test@example.com"},
+            {"id": self.other_user.id, "username": "other",
+             "email": "other@example.com"},
+        ])
+
+        # Same query count with more tasks: no per-row lookups.
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(
+                title="More", description="More", category=self.category,
+                created_by=self.user).assigned_users.set([self.user])
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(self.url, {
+                "fields": "id,category,assigned_users",
+                "expand": "category,assigned_users",
+            })
+        self.assertEqual(
+            len(more.captured_queries), len(ctx.captured_queries))
+
+    def test_renames_change_expanded_etags(self):
+        detail = reverse("productivity_app:task-detail", args=[self.task.pk])
+        params = {"expand": "category,assigned_users"}
+        responses = [self.client.get(url, params)
+                     for url in (self.url, detail)]
+
+        for rename in (self.rename_category, self.rename_user):
+            with self.subTest(rename=rename.__name__):
+                with self.captureOnCommitCallbacks(execute=True):
+                    rename()
+                for url, old in zip((self.url, detail), responses):
+                    response = self.client.get(
+                        url, params, HTTP_IF_NONE_MATCH=old["ETag"])
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertNotEqual(response["ETag"], old["ETag"])
+                responses = [self.client.get(url, params)
+                             for url in (self.url, detail)]
+
+        task = responses[1].data
+        self.assertEqual(task["category"]["name"], "Renamed")
+        self.assertIn("renamed", [
+            user["username"] for user in task["assigned_users"]])
+
+    def rename_category(self):
+        self.category.name = "Renamed"
+        self.category.save()
+
+    def rename_user(self):
+        self.other_user.username = "renamed"
+        self.other_user.save()
+
+    def test_task_detail_and_write_responses_honour_fields(self):
+        url = reverse("productivity_app:task-detail", args=[self.task.pk])
+        response = self.client.get(url, {"fields": "id,is_overdue"})
+        self.assertEqual(response.data, {"id": self.task.pk,
+                                         "is_overdue": False})
+
+        response = self.client.patch(
+            f"{url}?fields=title&expand=category",
+            {"title": "Renamed"}, format="json")
+        self.assertEqual(response.data, {"title": "Renamed"})
+        response = self.client.patch(
+            f"{url}?fields=category&expand=category",
+            {"category": self.category.pk}, format="json")
+        self.assertEqual(
+            response.data["category"],
+            {"id": self.category.id, "name": "Development"})
+
+    def test_cached_list_varies_with_fields(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {"fields": "id"})
+        self.assertEqual(list(response.data["results"][0]), ["id"])
+
+    def test_users_and_profiles(self):
+        response = self.client.get(
+            reverse("productivity_app:users-list"), {"fields": "username"})
+        self.assertEqual(
+            [user for user in response.data["results"]],
+            [{"username": "testuser"}, {"username": "other"}])
+
+        response = self.client.get(
+            reverse("productivity_app:users-list"),
+            {"fields": "id,profile", "expand": "profile"})
+        profile = response.data["results"][0]["profile"]
+        self.assertEqual(profile["user_name"], "testuser")
+
+        response = self.client.get(
+            reverse("productivity_app:profile-list"),
+            {"fields": "id,user", "expand": "user"})
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "user"})
+        self.assertEqual(
+            {p["user"]["username"] for p in response.data["results"]},
+            {"testuser", "other"})
@@ -0,0 +1,144 @@
+# productivity_app/uploads.py
+"""
+Background upload pipeline for task attachments.
+
+Requests only create ``File`` rows in the ``pending`` state; the actual
+transfer to the storage backend runs on a small thread pool once the
+surrounding transaction has committed, and flips the row to ``ready``
+(or ``failed``).
+
+The backend is pluggable through ``settings.FILE_UPLOAD_BACKEND`` so
+tests and local development can swap Cloudinary for the filesystem.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import cloudinary.uploader
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from .cache import invalidate_task_lists_for
+from .events import publish_task_changes
+from .models import File, Task
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_FOLDER = 'task_files'
+
+
+# ──────────────────────────────
+#  Storage backends
+# ──────────────────────────────
+class UploadBackend:
+    """
+    Stores one file and returns ``(stored_value, url)``.
+
+    ``stored_value`` is written to ``File.file`` and ``url`` to
+    ``File.url``.
+    """
+
+    def upload(self, content, folder):
+        raise NotImplementedError
+
+
+class CloudinaryUploadBackend(UploadBackend):
+    def upload(self, content, folder):
+        result = cloudinary.uploader.upload(content, folder=folder)
+        resource = CloudinaryResource(
+            result['public_id'],
+            version=str(result['version']),
+            format=result.get('format'),
+            type=result['type'],
+            resource_type=result['resource_type'],
+        )
+        return resource, result['secure_url']
+
+
+class LocalUploadBackend(UploadBackend):
+    """Writes under MEDIA_ROOT. Stand-in for Cloudinary in dev/tests."""
+
+    def upload(self, content, folder):
+        storage = FileSystemStorage()
+        name = storage.save(os.path.join(folder, content.name), content)
+        return name, storage.url(name)
+
+
+def get_upload_backend():
+    return import_string(settings.FILE_UPLOAD_BACKEND)()
+
+
+# ──────────────────────────────
+#  Worker pool
+# ──────────────────────────────
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.FILE_UPLOAD_WORKERS,
+                thread_name_prefix='file-upload',
+            )
+    return _executor
+
+
+def process_upload(file_id, content):
+    """Upload ``content`` and record the outcome on File ``file_id``."""
+    try:
+        stored, url = get_upload_backend().upload(content, UPLOAD_FOLDER)
+    except Exception:
+        logger.exception("Upload of file %s failed", file_id)
+        File.objects.filter(pk=file_id).update(status='failed')
+    else:
+        File.objects.filter(pk=file_id).update(
+            file=stored, url=url, status='ready')
+    # .update() sends no signals; refresh the task's caches and ETag,
+    # and push the new file state to the assignees.
+    task_ids = list(File.objects.filter(pk=file_id).values_list(
+        'task_id', flat=True))
+    invalidate_task_lists_for(task_ids)
+    Task.objects.filter(pk__in=task_ids).touch()
+    publish_task_changes(task_ids)
+
+
+def _process_in_worker(file_id, content):
+    try:
+        process_upload(file_id, content)
+    finally:
+        # Worker threads own their connection; don't leak it.
+        connection.close()
+
+
+def _dispatch(file_id, content):
+    if settings.FILE_UPLOAD_ASYNC:
+        get_executor().submit(_process_in_worker, file_id, content)
+    else:
+        process_upload(file_id, content)
+
+
+def queue_uploads(task, uploaded_files):
+    """
+    Create pending File rows for ``uploaded_files`` on ``task`` in one
+    INSERT and schedule their uploads for after the transaction commits.
+    """
+    if not uploaded_files:
+        return []
+    files = File.objects.bulk_create(
+        [File(task=task, status='pending') for _ in uploaded_files])
+    for file_obj, uploaded in zip(files, uploaded_files):
+        # The request's upload handlers close their files when the
+        # response is sent, so hand the worker its own copy.
+        content = ContentFile(
+            uploaded.read(), name=os.path.basename(uploaded.name))
+        transaction.on_commit(partial(_dispatch, file_obj.pk, content))
+    return files
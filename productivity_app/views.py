@@ -1,37 +1,108 @@
 # productivity_app/views.py
+from datetime import timedelta
 
 # rest_framework imports
 from rest_framework import generics, viewsets, views, status, permissions
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.fields import DateTimeField
 from rest_framework.permissions import (
+    SAFE_METHODS,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
     AllowAny,
 )
 
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.tokens import RefreshToken
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 # Django imports
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
 # Local application imports
-from .models import Profile, Task, Category, File
-from .permissions import IsAssignedOrReadOnly, IsSelfOrReadOnly
+from .cache import (
+    get_category_catalogue, profile_list_cache_key, task_list_cache_key
+)
+from .filters import TaskFilterSet, TaskOrderingFilter, TaskSearchFilter
+from .mixins import ConditionalGetMixin
+from .models import Profile, Task, TaskTombstone, Category
+from .pagination import TaskCursorPagination, TaskSyncPagination
+from .uploads import queue_uploads
+from .permissions import (
+    IsAssignedOrReadOnly, IsOwnerOrReadOnly, IsSelfOrReadOnly, is_assigned
+)
 from .serializers import (
     TaskSerializer,
+    TaskReadSerializer,
+    TaskBulkSerializer,
+    TaskSyncQuerySerializer,
     ProfileSerializer,
     RegisterSerializer,
     LoginSerializer,
     UserSerializer,
-    CategorySerializer
+    CategorySerializer,
+    requested_fieldset,
 )
 
 User = get_user_model()
 
 
+# Columns behind each UserSerializer / ProfileSerializer field, for
+# only(). Expanded fields count only when expanded.
+USER_FIELD_COLUMNS = {
+    'id': ('id',),
+    'username': ('username',),
+    'email': ('email',),
+    # The nested profile reads the names back through profile.user.
+    'profile': ('username', 'email', 'profile__id', 'profile__created_at',
+                'profile__updated_at'),
+}
+PROFILE_FIELD_COLUMNS = {
+    'id': ('id',),
+    'user_name': ('user__username',),
+    'user_email': ('user__email',),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+    'user': ('user__id', 'user__username', 'user__email'),
+}
+
+
+def sparse_columns(field_columns, request, expandable):
+    """
+    The columns ``field_columns`` lists for the fields a read ``request``
+    asks for with ``?fields=`` and ``?expand=``.
+    """
+    fields, expand = requested_fieldset(request)
+    return {
+        column
+        for name, columns in field_columns.items()
+        if (fields is None or name in fields)
+        and (name not in expandable or name in expand)
+        for column in columns
+    }
+
+
+def sparse_users(request):
+    """Users, with only the columns a read ``request`` needs."""
+    queryset = User.objects.all()
+    if request.method not in SAFE_METHODS:
+        return queryset
+    columns = sparse_columns(USER_FIELD_COLUMNS, request, {'profile'})
+    if 'profile__id' in columns:
+        queryset = queryset.select_related('profile')
+    return queryset.only('id', *columns)
+
+
 class RegisterViewSet(generics.CreateAPIView):
     """
     Handles user registration.
@@ -94,18 +165,17 @@ class LoginViewSet(views.APIView):
         }, status=status.HTTP_200_OK)
 
 
-class UsersListAPIView(views.APIView):
+class UsersListAPIView(generics.ListAPIView):
     """
-    A view to list all users.
+    A view to list all users, one cursor page at a time.
     Requires authentication to see the list.
     """
+    serializer_class = UserSerializer
     permission_classes = [
         IsAuthenticated]  # Only authenticated users can list users
 
-    def get(self, request):
-        users = User.objects.all()
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        return sparse_users(self.request)
 
 
 class UserDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
@@ -116,42 +186,60 @@ class UserDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsSelfOrReadOnly]
 
     def get_object(self):
-        # Return the current authenticated user instance only
-        return self.request.user
+        # Return the current authenticated user instance only. The JWT
+        # user carries no row, so load it.
+        return get_object_or_404(
+            sparse_users(self.request), pk=self.request.user.pk)
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     A viewset for viewing and editing user profiles.
-    Public can view all profiles. Authenticated users
-    can edit/delete only their own profile.
+    Public can view all profiles, one cursor page at a time.
+    Authenticated users can edit/delete only their own profile.
     """
     serializer_class = ProfileSerializer
-    queryset = Profile.objects.all()
-    permission_classes = [IsAuthenticatedOrReadOnly]
+    permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
     def get_queryset(self):
-        return Profile.objects.all()
-
-    def get_object(self):
-        obj = super().get_object()
-        if self.request.method in ['PUT', 'PATCH', 'DELETE']:
-            if self.request.user != obj.user:
-                raise PermissionDenied("You can only modify your own profile.")
-        return obj
-
-    def perform_update(self, serializer):
-        if self.request.user != serializer.instance.user:
-            raise PermissionDenied("You can only update your own profile.")
-        serializer.save()
-
-    def perform_destroy(self, instance):
-        if self.request.user != instance.user:
-            raise PermissionDenied("You can only delete your own profile.")
-        instance.delete()
+        return self.load_columns(Profile.objects.all())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Cursor links are built from the ordering columns of the page,
+        # which may be the user's (?ordering=user__username).
+        ordering = [
+            field.lstrip('-') for field in queryset.query.order_by
+            if isinstance(field, str)
+        ]
+        return self.load_columns(queryset, ordering)
+
+    def load_columns(self, queryset, keep=()):
+        # One joined query, reading only the columns the serializer uses
+        # (and the ?fields= / ?expand= of reads ask for).
+        if self.request.method not in SAFE_METHODS:
+            columns = {'created_at', 'user__username', 'user__email'}
+        else:
+            columns = sparse_columns(
+                PROFILE_FIELD_COLUMNS, self.request, {'user'})
+        columns = {*columns, *keep}
+        if any(column.startswith('user__') for column in columns):
+            queryset = queryset.select_related('user')
+        return queryset.only('id', 'updated_at', *columns)
+
+    def list(self, request, *args, **kwargs):
+        """
+        The public directory is the same for everyone: serve each page
+        from the shared cache until a profile, or its user's name or
+        email, changes (see signals.py).
+        """
+        return self.cached_list(
+            profile_list_cache_key(request),
+            settings.PROFILE_LIST_CACHE_TIMEOUT,
+            request, *args, **kwargs)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     A viewset for viewing, creating, updating, and deleting Task instances.
     Users can only see and edit tasks where they are assigned.
@@ -159,13 +247,67 @@ class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     # Only authenticated users can interact
     permission_classes = [IsAssignedOrReadOnly]
+    pagination_class = TaskCursorPagination
+    # is_overdue changes at midnight without any write.
+    date_dependent = True
     parser_classes = (JSONParser, MultiPartParser, FormParser)
 
+    filter_backends = [
+        DjangoFilterBackend, TaskSearchFilter, TaskOrderingFilter]
+    filterset_class = TaskFilterSet
+    # Only columns that lead an index; see Task.Meta.indexes.
+    ordering_fields = [
+        'id', 'due_date', 'priority', 'status', 'category',
+        'created_at', 'updated_at',
+    ]
+
     def get_queryset(self):
         user = self.request.user
+        fields, expand = requested_fieldset(self.request)
+        queryset = Task.objects.all()
+        if self.action == 'list':
+            # Single objects load relations lazily: same query count,
+            # and a 304 from ConditionalGetMixin then needs only one.
+            queryset = queryset.with_related(fields, expand)
+        elif ('category' in expand and (fields is None or 'category' in fields)
+              and self.request.method in SAFE_METHODS):
+            queryset = queryset.select_related('category')
         if user.is_authenticated:
-            return Task.objects.filter(assigned_users=user).distinct()
-        return Task.objects.all()
+            return queryset.assigned_to(user)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, expand = requested_fieldset(self.request)
+        if fields is None or self.request.method not in SAFE_METHODS:
+            return queryset
+        # Cursor links are built from the ordering columns of the page.
+        ordering = [
+            field.lstrip('-')
+            for field in (*queryset.query.order_by, *self.paginator.ordering)
+            if isinstance(field, str)
+        ]
+        return queryset.only_fields(fields, expand, keep=ordering)
+
+    def get_serializer_class(self):
+        # Reads (list, retrieve, sync) skip ModelSerializer's per-field
+        # machinery; the output is the same.
+        if self.request.method in SAFE_METHODS:
+            return TaskReadSerializer
+        return TaskSerializer
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serve a user's list from the cache until one of their tasks,
+        files or assignments changes (see signals.py). The cached entry
+        keeps its validators, so a matching If-None-Match gets a 304
+        without touching the database.
+        """
+        if not request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        return self.cached_list(
+            task_list_cache_key(request), settings.TASK_LIST_CACHE_TIMEOUT,
+            request, *args, **kwargs)
 
     def perform_create(self, serializer):
         """
@@ -176,26 +318,22 @@ class TaskViewSet(viewsets.ModelViewSet):
         assigned_users_data = serializer.validated_data.get(
             'assigned_users', [])
         # Save the task instance, ensuring the creator is set
-        task = serializer.save(created_by=self.request.user)
+        task = serializer.save(created_by_id=self.request.user.pk)
 
         # Ensure the creating user is assigned to the task
         if not assigned_users_data:
-            task.assigned_users.set([self.request.user])
+            task.assigned_users.set([self.request.user.pk])
 
-        # Check for and handle file uploads
-        files = self.request.FILES.getlist('files')
-        if files:
-            for file in files:
-                File.objects.create(task=task, file=file)
+        # Queue any uploaded files; they are stored in the background
+        queue_uploads(task, self.request.FILES.getlist('files'))
 
     def perform_update(self, serializer):
         """
         Override perform_update to ensure the logged-in user
         is assigned to the task before allowing the update.
         """
-        task = self.get_object()
-        # Check if the requesting user is assigned to the task
-        if self.request.user not in task.assigned_users.all():
+        # Memoized by IsAssignedOrReadOnly; costs no extra query.
+        if not is_assigned(self.request, serializer.instance):
             raise PermissionDenied(
                 "You do not have permission to edit this task.")
 
@@ -206,12 +344,112 @@ class TaskViewSet(viewsets.ModelViewSet):
         Override perform_destroy to ensure the logged-in user
         is assigned to the task before allowing deletion.
         """
-        # Check if the requesting user is assigned to the task
-        if self.request.user not in instance.assigned_users.all():
+        # Memoized by IsAssignedOrReadOnly; costs no extra query.
+        if not is_assigned(self.request, instance):
             raise PermissionDenied(
                 "You do not have permission to delete this task.")
         instance.delete()
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Create, update and delete many tasks in one request.
+        Only tasks the user is assigned to can be updated or deleted.
+        """
+        serializer = TaskBulkSerializer(
+            data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='overdue-count')
+    def overdue_count(self, request):
+        """
+        Number of overdue tasks, honouring the list's filters. One COUNT
+        over the partial overdue index.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response({'count': queryset.overdue().order_by().count()})
+
+    @action(detail=False, methods=['get'], url_path='stats',
+            permission_classes=[IsAuthenticated])
+    def stats(self, request):
+        """
+        Dashboard counts for the user's tasks (per status, priority and
+        category, overdue, completion rates), honouring the list's
+        filters. One GROUP BY query, cached (with a shared cache) for
+        TASK_STATS_CACHE_TIMEOUT seconds until one of the user's tasks
+        changes.
+        """
+        timeout = settings.TASK_STATS_CACHE_TIMEOUT
+        if not settings.SHARED_CACHE:
+            timeout = 0
+        key = task_list_cache_key(request) if timeout else None
+        data = cache.get(key) if key else None
+        if data is None:
+            data = self.filter_queryset(self.get_queryset()).stats()
+            if key:
+                cache.set(key, data, timeout)
+        return Response(data)
+
+    @action(detail=False, methods=['get'], url_path='sync',
+            permission_classes=[IsAuthenticated])
+    def sync(self, request):
+        """
+        Tasks changed and removed since ``?since=<cursor>``.
+
+        Returns the user's tasks updated after the cursor and the ids of
+        tasks deleted or unassigned from them (tombstones), plus a new
+        cursor for the next call. Without a cursor, or with one older
+        than the tombstone retention, ``reset`` is true and ``changed``
+        holds every task.
+
+        ``changed`` is paged (TASK_SYNC_PAGE_SIZE). While ``next`` is set,
+        follow it for the rest; its pages repeat the first page's
+        ``cursor`` and carry no ``reset`` or ``deleted``. Store the
+        cursor only once ``next`` is null.
+        """
+        query = TaskSyncQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data.get('since')
+        now = query.validated_data.get('as_of') or timezone.now()
+
+        retention = timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+        reset = since is None or since < now - retention
+
+        fields, expand = requested_fieldset(request)
+        tasks = Task.objects.assigned_to(request.user).with_related(
+            fields, expand)
+        if fields is not None:
+            tasks = tasks.only_fields(fields, expand, keep=('updated_at',))
+        deleted = []
+        if not reset:
+            since -= timedelta(seconds=settings.TASK_SYNC_OVERLAP_SECONDS)
+            tasks = tasks.filter(updated_at__gt=since)
+            deleted = TaskTombstone.objects.filter(
+                user_id=request.user.pk, deleted_at__gt=since,
+            ).exclude(
+                # Removed, then assigned again: the task is in "changed".
+                task_id__in=Task.objects.assigned_to(
+                    request.user).values('pk'),
+            ).values_list('task_id', flat=True).distinct()
+
+        paginator = TaskSyncPagination()
+        page = paginator.paginate_queryset(tasks, request, view=self)
+        first_page = paginator.cursor is None
+        cursor = DateTimeField().to_representation(now)
+        next_link = paginator.get_next_link()
+        if next_link is not None:
+            next_link = replace_query_param(next_link, 'as_of', cursor)
+
+        serializer = self.get_serializer(page, many=True)
+        return Response({
+            'cursor': cursor,
+            'reset': reset and first_page,
+            'next': next_link,
+            'changed': serializer.data,
+            'deleted': sorted(deleted) if first_page else [],
+        })
+
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -221,3 +459,23 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
     authentication_classes = []
+    # The catalogue is small and always loaded whole by the frontend.
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serve the cached catalogue; answers 304 when the client's copy
+        (If-None-Match / If-Modified-Since) is still current.
+        """
+        catalogue = get_category_catalogue()
+        not_modified = get_conditional_response(
+            request,
+            etag=catalogue.etag,
+            last_modified=catalogue.last_modified,
+        )
+        if not_modified is not None:
+            return not_modified
+        return Response(catalogue.data, headers={
+            'ETag': catalogue.etag,
+            'Last-Modified': http_date(catalogue.last_modified),
+        })